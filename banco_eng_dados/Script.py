@@ -1,21 +1,25 @@
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
 import pandas as pd
-import pyodbc
-
-# Conexão com o banco de dados no Docker
-try:
-    conn_str = (
-        "DRIVER={ODBC Driver 17 for SQL Server};"
-        "SERVER=127.0.0.1;"
-        "DATABASE=projeto_ed;"
-        "UID=sa;"
-        "PWD=satc@2025"
-    )
-    conn = pyodbc.connect(conn_str, autocommit=True)
-    cursor = conn.cursor()
-    print("Conexão com o banco de dados estabelecida com sucesso.")
-except Exception as e:
-    print("Erro ao conectar no banco de dados:", e)
-    exit(1)
+
+DIRETORIO_CSV = "./banco_eng_dados"
+# Impressões digitais (PK + hash da linha) do que já foi carregado, por tabela
+DIRETORIO_ESTADO = os.path.join(DIRETORIO_CSV, ".estado_carga")
+TAMANHO_CHUNK = 50000
+MODOS_CARGA = ["colunar", "tuplas"]
+# imediatas: PK na criação da tabela; adiadas: tabelas heap, PK criada após a carga
+MODOS_CONSTRAINTS = ["imediatas", "adiadas"]
+N_WORKERS = 4
+# completa: DROP + carga total; incremental: aplica só inserts/updates/deletes
+MODOS_ATUALIZACAO = ["completa", "incremental"]
 
 # Dicionário com nomes dos arquivos e DDLs atualizadas
 csv_tables = {
@@ -104,39 +108,7 @@ csv_tables = {
     """
 }
 
-# Criar tabelas
-for nome_tabela, ddl in csv_tables.items():
-    try:
-        print(f"\nCriando tabela {nome_tabela}...")
-        cursor.execute(f"IF OBJECT_ID('{nome_tabela}', 'U') IS NOT NULL DROP TABLE {nome_tabela}")
-        cursor.execute(ddl)
-        print(f"Tabela {nome_tabela} criada com sucesso.")
-    except Exception as e:
-        print(f"Erro ao criar tabela {nome_tabela}:", e)
-
-# Inserir dados dos CSVs
-for nome_tabela in csv_tables:
-    try:
-        print(f"\nLendo arquivo {nome_tabela}.csv...")
-        df = pd.read_csv(f"./banco_eng_dados/{nome_tabela}.csv")
-        print(f"Inserindo dados em {nome_tabela}...")
-
-        cols = ", ".join(df.columns)
-        placeholders = ", ".join(["?"] * len(df.columns))
-
-        # Converte tipos numpy para tipos Python nativos
-        data = [tuple(map(lambda x: x.item() if hasattr(x, 'item') else x, row)) for row in df.to_numpy()]
-
-        cursor.fast_executemany = True
-        cursor.executemany(f"INSERT INTO {nome_tabela} ({cols}) VALUES ({placeholders})", data)
-
-        print(f"Dados inseridos com sucesso em {nome_tabela}.")
-    except FileNotFoundError:
-        print(f"Arquivo {nome_tabela}.csv não encontrado.")
-    except Exception as e:
-        print(f"Erro geral ao inserir dados em {nome_tabela}:", e)
-
-# Adicionar foreign keys
+# Foreign keys adicionadas após a carga
 fks = [
     "ALTER TABLE endereco ADD CONSTRAINT fk_endereco_cliente FOREIGN KEY (id_cliente) REFERENCES cliente(id_cliente)",
     "ALTER TABLE livro ADD CONSTRAINT fk_livro_autor FOREIGN KEY (id_autor) REFERENCES autor(id_autor)",
@@ -148,27 +120,871 @@ fks = [
     "ALTER TABLE pagamento ADD CONSTRAINT fk_pagamento_pedido FOREIGN KEY (id_pedido) REFERENCES pedido(id_pedido)"
 ]
 
-print("\nAdicionando FKs...")
-for fk in fks:
+
+def relacoes_fk(fks=fks):
+    """
+    FKs decompostas em (tabela, coluna, tabela referenciada, coluna referenciada, ALTER)
+    """
+    padrao = r"ALTER TABLE (\w+) .*FOREIGN KEY \((\w+)\) REFERENCES (\w+)\((\w+)\)"
+    return [re.search(padrao, fk).groups() + (fk,) for fk in fks]
+
+
+def dependencias_fk(fks=fks):
+    """
+    Grafo de dependências a partir das FKs: tabela -> tabelas referenciadas
+    """
+    dependencias = {}
+    for filha, _, pai, _, _ in relacoes_fk(fks):
+        if filha != pai:
+            dependencias.setdefault(filha, set()).add(pai)
+    return dependencias
+
+
+def niveis_carga(tabelas, dependencias):
+    """
+    Ordena as tabelas em níveis topológicos: cada nível só depende dos anteriores
+    """
+    pendentes = {t: dependencias.get(t, set()) & set(tabelas) for t in tabelas}
+    niveis = []
+    carregadas = set()
+    while pendentes:
+        nivel = [t for t, pais in pendentes.items() if pais <= carregadas]
+        if not nivel:
+            raise ValueError(f"Ciclo nas FKs entre as tabelas: {sorted(pendentes)}")
+        niveis.append(nivel)
+        carregadas.update(nivel)
+        for t in nivel:
+            del pendentes[t]
+    return niveis
+
+
+# Tipo SQL da DDL -> dtype usado na leitura do CSV
+DTYPES_CSV = {
+    "INT": "Int64",
+    "DECIMAL": "float64",
+    "VARCHAR": "string",
+    "DATE": "string",
+}
+
+
+def tipos_colunas(ddl):
+    """
+    Colunas da DDL com (tipo, tamanho, escala), na ordem de criação
+    """
+    tipos = {}
+    for nome, tipo, args in re.findall(r"^\s*(\w+)\s+([A-Z]+)(?:\((\d+(?:,\d+)?)\))?", ddl, re.M):
+        if tipo not in DTYPES_CSV:
+            continue
+        tamanho, _, escala = (args or "0").partition(",")
+        tipos[nome] = (tipo, int(tamanho), int(escala or 0))
+    return tipos
+
+
+def chave_primaria(ddl):
+    """
+    Coluna declarada como PRIMARY KEY na DDL
+    """
+    return re.search(r"(\w+)\s+\w+\s+PRIMARY KEY", ddl).group(1)
+
+
+def ddl_heap(ddl):
+    """
+    DDL sem a PK (tabela heap, sem índice durante a carga); a coluna fica NOT NULL
+    para a PK poder ser criada depois
+    """
+    return ddl.replace("PRIMARY KEY", "NOT NULL")
+
+
+def validar_integridade(diretorio=DIRETORIO_CSV, n_amostras=5):
+    """
+    Valida os CSVs antes de qualquer acesso ao banco, guiada pela lista de FKs:
+    chaves nulas ou que não são inteiros, PKs duplicadas e valores de FK sem a
+    chave correspondente na tabela pai (anti-join vetorizado com np.isin).
+    Lê só as colunas de chave.
+    Retorna a lista de problemas encontrados (vazia se estiver tudo certo).
+    """
+    inicio = time.perf_counter()
+    relacoes = relacoes_fk()
+    colunas = {}
+    for nome_tabela, ddl in csv_tables.items():
+        colunas.setdefault(nome_tabela, set()).add(chave_primaria(ddl))
+    for filha, coluna, pai, coluna_pai, _ in relacoes:
+        colunas.setdefault(filha, set()).add(coluna)
+        colunas.setdefault(pai, set()).add(coluna_pai)
+
+    chaves = {}
+    problemas = []
+    for nome_tabela, usadas in colunas.items():
+        try:
+            df = pd.read_csv(os.path.join(diretorio, f"{nome_tabela}.csv"), usecols=sorted(usadas), dtype=str)
+        except FileNotFoundError:
+            print(f"Arquivo {nome_tabela}.csv não encontrado; validação da tabela ignorada.")
+            continue
+        chaves[nome_tabela] = {}
+        for coluna in sorted(usadas):
+            texto = df[coluna]
+            numeros = pd.to_numeric(texto, errors="coerce")
+            nulas = texto.isna()
+            invalidas = ~nulas & (numeros.isna() | (numeros % 1 != 0))
+            if nulas.any():
+                problemas.append(f"{nome_tabela}.{coluna}: {int(nulas.sum())} chaves nulas")
+            if invalidas.any():
+                exemplos = texto[invalidas].unique()[:n_amostras].tolist()
+                problemas.append(f"{nome_tabela}.{coluna}: {int(invalidas.sum())} chaves não inteiras, "
+                                 f"ex.: {exemplos}")
+            chaves[nome_tabela][coluna] = numeros[~nulas & ~invalidas].to_numpy(dtype=np.int64)
+
+    for nome_tabela, dados in chaves.items():
+        pk = chave_primaria(csv_tables[nome_tabela])
+        valores, contagem = np.unique(dados[pk], return_counts=True)
+        duplicadas = valores[contagem > 1]
+        if len(duplicadas):
+            problemas.append(f"{nome_tabela}.{pk}: {len(duplicadas)} PKs duplicadas, "
+                             f"ex.: {duplicadas[:n_amostras].tolist()}")
+
+    for filha, coluna, pai, coluna_pai, _ in relacoes:
+        if filha not in chaves or pai not in chaves:
+            continue
+        valores = chaves[filha][coluna]
+        orfas = ~np.isin(valores, chaves[pai][coluna_pai])
+        if orfas.any():
+            exemplos = np.unique(valores[orfas])[:n_amostras].tolist()
+            problemas.append(f"{filha}.{coluna} -> {pai}.{coluna_pai}: {int(orfas.sum())} linhas órfãs "
+                             f"({len(np.unique(valores[orfas]))} chaves distintas), ex.: {exemplos}")
+
+    print(f"\nValidação de integridade concluída em {time.perf_counter() - inicio:.2f}s: "
+          f"{len(problemas)} problema(s).")
+    for problema in problemas:
+        print(f"  {problema}")
+    return problemas
+
+
+_trava_saida = threading.Lock()
+
+
+def log(mensagem):
+    """
+    print seguro para os workers (sem misturar linhas de threads diferentes)
+    """
+    with _trava_saida:
+        print(mensagem, flush=True)
+
+
+class ConexoesPorThread:
+    """
+    Uma conexão por thread do pool, aberta na primeira tarefa do worker
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._local = threading.local()
+        self._conexoes = []
+        self._trava = threading.Lock()
+
+    def obter(self):
+        if not hasattr(self._local, "conn"):
+            self._local.conn = self.backend.conectar()
+            with self._trava:
+                self._conexoes.append(self._local.conn)
+        return self._local.conn
+
+    def fechar(self):
+        for conn in self._conexoes:
+            conn.close()
+        self._conexoes.clear()
+
+
+class BackendSQLServer:
+    """
+    SQL Server no Docker, via pyodbc com fast_executemany
+    """
+
+    nome = "SQL Server"
+
+    def __init__(self, conn_str=None):
+        import pyodbc
+
+        self._pyodbc = pyodbc
+        self.conn_str = conn_str or (
+            "DRIVER={ODBC Driver 17 for SQL Server};"
+            "SERVER=127.0.0.1;"
+            "DATABASE=projeto_ed;"
+            "UID=sa;"
+            "PWD=satc@2025"
+        )
+
+    @property
+    def destino(self):
+        # Identifica o banco no estado da carga incremental (sem a senha)
+        return re.sub(r"PWD=[^;]*;?", "", self.conn_str)
+
+    def conectar(self):
+        return self._pyodbc.connect(self.conn_str, autocommit=False)
+
+    def preparar_cursor(self, cursor):
+        cursor.fast_executemany = True
+
+    def definir_tipos(self, cursor, tipos):
+        """
+        Declara o tipo de cada parâmetro uma vez por lote, para o driver montar os
+        buffers de coluna direto (sem inspecionar o tipo de cada valor)
+        """
+        p = self._pyodbc
+        tamanhos = []
+        for tipo, tamanho, escala in tipos:
+            if tipo == "INT":
+                tamanhos.append((p.SQL_INTEGER, 0, 0))
+            elif tipo == "DECIMAL":
+                # float é convertido para DECIMAL(p,s) pelo servidor
+                tamanhos.append((p.SQL_DOUBLE, 0, 0))
+            elif tipo == "DATE":
+                tamanhos.append((p.SQL_VARCHAR, 10, 0))
+            else:
+                tamanhos.append((p.SQL_WVARCHAR, tamanho, 0))
+        cursor.setinputsizes(tamanhos)
+
+    def recriar_tabela(self, cursor, nome_tabela, ddl):
+        cursor.execute(f"IF OBJECT_ID('{nome_tabela}', 'U') IS NOT NULL DROP TABLE {nome_tabela}")
+        cursor.execute(ddl)
+
+    def criar_se_nao_existir(self, cursor, nome_tabela, ddl):
+        if cursor.execute(f"SELECT OBJECT_ID('{nome_tabela}', 'U')").fetchone()[0] is not None:
+            return False
+        cursor.execute(ddl)
+        return True
+
+    def adicionar_fk(self, cursor, fk):
+        nome = re.search(r"ADD CONSTRAINT (\w+)", fk).group(1)
+        cursor.execute(f"IF NOT EXISTS (SELECT 1 FROM sys.foreign_keys WHERE name = '{nome}') {fk}")
+        return True
+
+    def criar_staging(self, cursor, nome_tabela, colunas, sufixo="stg"):
+        staging = f"#{sufixo}_{nome_tabela}"
+        cursor.execute(f"IF OBJECT_ID('tempdb..{staging}') IS NOT NULL DROP TABLE {staging}")
+        cursor.execute(f"SELECT TOP 0 {', '.join(colunas)} INTO {staging} FROM {nome_tabela}")
+        return staging
+
+    def descartar_staging(self, cursor, staging):
+        cursor.execute(f"DROP TABLE {staging}")
+
+    def mesclar(self, cursor, nome_tabela, staging, pk, colunas):
+        atualizacao = ", ".join(f"{c} = origem.{c}" for c in colunas if c != pk)
+        cursor.execute(
+            f"MERGE {nome_tabela} WITH (HOLDLOCK) AS alvo USING {staging} AS origem "
+            f"ON alvo.{pk} = origem.{pk} "
+            f"WHEN MATCHED THEN UPDATE SET {atualizacao} "
+            f"WHEN NOT MATCHED BY TARGET THEN INSERT ({', '.join(colunas)}) "
+            f"VALUES ({', '.join('origem.' + c for c in colunas)});"
+        )
+
+    def criar_chave_primaria(self, cursor, nome_tabela, coluna):
+        cursor.execute(
+            f"IF NOT EXISTS (SELECT 1 FROM sys.key_constraints WHERE name = 'pk_{nome_tabela}') "
+            f"ALTER TABLE {nome_tabela} ADD CONSTRAINT pk_{nome_tabela} PRIMARY KEY CLUSTERED ({coluna})"
+        )
+
+    def criar_indice(self, cursor, nome_tabela, coluna):
+        cursor.execute(
+            f"IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'ix_{nome_tabela}_{coluna}') "
+            f"CREATE INDEX ix_{nome_tabela}_{coluna} ON {nome_tabela} ({coluna})"
+        )
+
+
+class BackendSQLite:
+    """
+    Stand-in local para testes: mesmo fluxo de carga gravando em um arquivo SQLite
+    """
+
+    nome = "SQLite"
+
+    def __init__(self, caminho_db="projeto_ed.db"):
+        self.caminho_db = caminho_db
+
+    @property
+    def destino(self):
+        return os.path.abspath(self.caminho_db)
+
+    def conectar(self):
+        # Cada conexão é usada por um único worker, mas é fechada pela thread principal
+        return sqlite3.connect(self.caminho_db, timeout=60, check_same_thread=False)
+
+    def preparar_cursor(self, cursor):
+        pass
+
+    def definir_tipos(self, cursor, tipos):
+        pass
+
+    def recriar_tabela(self, cursor, nome_tabela, ddl):
+        cursor.execute(f"DROP TABLE IF EXISTS {nome_tabela}")
+        cursor.execute(ddl)
+
+    def criar_se_nao_existir(self, cursor, nome_tabela, ddl):
+        existe = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (nome_tabela,)
+        ).fetchone()
+        if existe:
+            return False
+        cursor.execute(ddl)
+        return True
+
+    def criar_staging(self, cursor, nome_tabela, colunas, sufixo="stg"):
+        staging = f"temp.{sufixo}_{nome_tabela}"
+        cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+        cursor.execute(f"CREATE TABLE {staging} AS SELECT {', '.join(colunas)} FROM {nome_tabela} WHERE 0")
+        return staging
+
+    def descartar_staging(self, cursor, staging):
+        cursor.execute(f"DROP TABLE {staging}")
+
+    def mesclar(self, cursor, nome_tabela, staging, pk, colunas):
+        # Sem MERGE no SQLite: UPDATE ... FROM para as existentes e INSERT das novas
+        atualizacao = ", ".join(f"{c} = origem.{c}" for c in colunas if c != pk)
+        cursor.execute(
+            f"UPDATE {nome_tabela} SET {atualizacao} FROM {staging} AS origem "
+            f"WHERE {nome_tabela}.{pk} = origem.{pk}"
+        )
+        cursor.execute(
+            f"INSERT INTO {nome_tabela} ({', '.join(colunas)}) SELECT {', '.join(colunas)} FROM {staging} AS origem "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {nome_tabela} AS alvo WHERE alvo.{pk} = origem.{pk})"
+        )
+
+    def adicionar_fk(self, cursor, fk):
+        # SQLite não suporta ALTER TABLE ... ADD CONSTRAINT
+        return False
+
+    def criar_chave_primaria(self, cursor, nome_tabela, coluna):
+        # Sem ADD CONSTRAINT: a PK adiada vira um índice único
+        cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS pk_{nome_tabela} ON {nome_tabela} ({coluna})")
+
+    def criar_indice(self, cursor, nome_tabela, coluna):
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS ix_{nome_tabela}_{coluna} ON {nome_tabela} ({coluna})")
+
+
+def criar_tabelas(backend, conn, constraints="imediatas", diretorio_estado=DIRETORIO_ESTADO):
+    cursor = conn.cursor()
+    for nome_tabela, ddl in csv_tables.items():
+        try:
+            print(f"\nCriando tabela {nome_tabela}...")
+            # O estado sai antes do DROP: se a carga morrer depois daqui, a próxima
+            # execução incremental não confia em impressões de uma tabela vazia
+            remover_estado(diretorio_estado, nome_tabela)
+            backend.recriar_tabela(cursor, nome_tabela, ddl_heap(ddl) if constraints == "adiadas" else ddl)
+            conn.commit()
+            print(f"Tabela {nome_tabela} criada com sucesso.")
+        except Exception as e:
+            conn.rollback()
+            print(f"Erro ao criar tabela {nome_tabela}:", e)
+
+
+def garantir_tabelas(backend, conn, constraints="imediatas"):
+    """
+    Modo incremental: cria só as tabelas que ainda não existem.
+    Retorna as tabelas criadas (o estado anterior delas não vale mais).
+    """
+    cursor = conn.cursor()
+    criadas = []
+    for nome_tabela, ddl in csv_tables.items():
+        try:
+            if backend.criar_se_nao_existir(cursor, nome_tabela, ddl_heap(ddl) if constraints == "adiadas" else ddl):
+                conn.commit()
+                criadas.append(nome_tabela)
+                print(f"Tabela {nome_tabela} criada com sucesso.")
+        except Exception as e:
+            conn.rollback()
+            print(f"Erro ao criar tabela {nome_tabela}:", e)
+    return criadas
+
+
+def linhas_tuplas(chunk):
+    """
+    Caminho antigo: converte célula a célula os escalares numpy para Python
+    """
+    return [tuple(map(lambda x: x.item() if hasattr(x, 'item') else x, row)) for row in chunk.to_numpy()]
+
+
+def linhas_colunar(chunk):
+    """
+    Converte cada coluna de uma vez para valores Python (nulos viram None)
+    e monta as linhas só juntando as colunas já convertidas
+    """
+    colunas = []
+    for nome in chunk.columns:
+        serie = chunk[nome]
+        if serie.hasnans:
+            serie = serie.astype(object).where(serie.notna(), None)
+        colunas.append(serie.tolist())
+    return list(zip(*colunas))
+
+
+def ler_csv_tipado(nome_tabela, tamanho_chunk=TAMANHO_CHUNK, diretorio=DIRETORIO_CSV):
+    """
+    Iterador de chunks do CSV com os dtypes derivados da DDL
+    """
+    tipos = tipos_colunas(csv_tables[nome_tabela])
+    return pd.read_csv(
+        os.path.join(diretorio, f"{nome_tabela}.csv"),
+        chunksize=tamanho_chunk,
+        dtype={coluna: DTYPES_CSV[tipo] for coluna, (tipo, _, _) in tipos.items()},
+    )
+
+
+def inserir_chunk(backend, cursor, destino, nome_tabela, chunk):
+    """
+    Insere um chunk tipado (modo colunar) na tabela ou staging destino
+    """
+    tipos = tipos_colunas(csv_tables[nome_tabela])
+    cols = ", ".join(chunk.columns)
+    placeholders = ", ".join(["?"] * len(chunk.columns))
+    backend.definir_tipos(cursor, [tipos[coluna] for coluna in chunk.columns])
+    cursor.executemany(f"INSERT INTO {destino} ({cols}) VALUES ({placeholders})", linhas_colunar(chunk))
+
+
+def impressoes(chunk, pk):
+    """
+    PKs e impressão digital (hash de 64 bits da linha inteira) de cada linha
+    """
+    return (
+        chunk[pk].to_numpy(dtype=np.int64),
+        pd.util.hash_pandas_object(chunk, index=False).to_numpy(),
+    )
+
+
+def carregar_tabela(backend, conn, nome_tabela, tamanho_chunk=TAMANHO_CHUNK, diretorio=DIRETORIO_CSV, modo="colunar",
+                    digitais=None):
+    """
+    Lê o CSV em chunks e insere cada chunk com executemany, com commit por chunk.
+    No modo colunar os tipos vêm da DDL: o CSV já é lido tipado e o driver recebe
+    os tipos dos parâmetros antes do lote. Se digitais for uma lista, recebe as
+    impressões (pks, hashes) de cada chunk. Retorna (linhas inseridas, segundos).
+    """
+    cursor = conn.cursor()
+    backend.preparar_cursor(cursor)
+
+    inicio = time.perf_counter()
+    total = 0
+    if modo == "colunar":
+        pk = chave_primaria(csv_tables[nome_tabela])
+        for chunk in ler_csv_tipado(nome_tabela, tamanho_chunk, diretorio):
+            inserir_chunk(backend, cursor, nome_tabela, nome_tabela, chunk)
+            conn.commit()
+            if digitais is not None:
+                digitais.append(impressoes(chunk, pk))
+            total += len(chunk)
+        return total, time.perf_counter() - inicio
+
+    for chunk in pd.read_csv(os.path.join(diretorio, f"{nome_tabela}.csv"), chunksize=tamanho_chunk):
+        cols = ", ".join(chunk.columns)
+        placeholders = ", ".join(["?"] * len(chunk.columns))
+        cursor.executemany(f"INSERT INTO {nome_tabela} ({cols}) VALUES ({placeholders})", linhas_tuplas(chunk))
+        conn.commit()
+        total += len(chunk)
+
+    return total, time.perf_counter() - inicio
+
+
+def _arquivo_estado(diretorio_estado, nome_tabela):
+    return os.path.join(diretorio_estado, f"{nome_tabela}.npz")
+
+
+def salvar_estado(diretorio_estado, nome_tabela, destino, pks, hashes):
+    """
+    Grava as impressões do que está carregado, ordenadas por PK
+    """
+    ordem = np.argsort(pks, kind="stable")
+    os.makedirs(diretorio_estado, exist_ok=True)
+    caminho = _arquivo_estado(diretorio_estado, nome_tabela)
+    # Grava em arquivo temporário e renomeia para não expor um estado pela metade
+    temporario = caminho + f".{os.getpid()}.{threading.get_ident()}.tmp.npz"
+    np.savez(temporario, pks=pks[ordem], hashes=hashes[ordem], destino=np.array(destino))
+    os.replace(temporario, caminho)
+
+
+def carregar_estado(diretorio_estado, nome_tabela, destino):
+    """
+    (pks ordenadas, hashes) da última carga neste destino, ou None se não houver
+    """
+    caminho = _arquivo_estado(diretorio_estado, nome_tabela)
+    if not os.path.exists(caminho):
+        return None
+    with np.load(caminho) as dados:
+        if str(dados["destino"]) != destino:
+            return None
+        return dados["pks"], dados["hashes"]
+
+
+def remover_estado(diretorio_estado, nome_tabela):
+    caminho = _arquivo_estado(diretorio_estado, nome_tabela)
+    if os.path.exists(caminho):
+        os.remove(caminho)
+
+
+def _juntar_digitais(digitais):
+    if not digitais:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+    pks, hashes = zip(*digitais)
+    return np.concatenate(pks), np.concatenate(hashes)
+
+
+def _por_dependencia(backend, tarefa, n_workers, reverso=False):
+    """
+    Executa tarefa(conn, tabela) no pool respeitando as FKs: uma tabela entra na
+    fila assim que todas as tabelas que ela referencia terminaram (com reverso,
+    assim que todas as que a referenciam terminaram). Cada worker usa a sua
+    própria conexão. Retorna {tabela: resultado} das tarefas que não devolveram None.
+    """
+    dependencias = dependencias_fk()
+    if reverso:
+        invertidas = {}
+        for filha, pais in dependencias.items():
+            for pai in pais:
+                invertidas.setdefault(pai, set()).add(filha)
+        dependencias = invertidas
+
+    conexoes = ConexoesPorThread(backend)
+    resultados = {}
+    pendentes = {t: dependencias.get(t, set()) & set(csv_tables) for t in csv_tables}
+    concluidas = set()
+    em_execucao = {}
     try:
-        cursor.execute(fk)
-        print(f"Executado: {fk}")
-    except Exception as e:
-        print(f"Erro ao adicionar FK: {fk} -> {e}")
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            while pendentes or em_execucao:
+                for nome_tabela in [t for t, deps in pendentes.items() if deps <= concluidas]:
+                    del pendentes[nome_tabela]
+                    em_execucao[pool.submit(lambda t: tarefa(conexoes.obter(), t), nome_tabela)] = nome_tabela
 
-print("\nFinalizado com sucesso.")
-conn.close()
+                feitas, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                for futuro in feitas:
+                    nome_tabela = em_execucao.pop(futuro)
+                    # Mesmo com erro a tabela é liberada: as FKs só são aplicadas no final
+                    concluidas.add(nome_tabela)
+                    if futuro.result() is not None:
+                        resultados[nome_tabela] = futuro.result()
+    finally:
+        conexoes.fechar()
+    return resultados
 
 
-import sqlite3
-import pandas as pd
+def _imprimir_niveis():
+    # Valida o grafo (levanta erro se houver ciclo) antes de abrir conexões
+    print("\nNíveis de carga: " + " -> ".join(
+        "[" + ", ".join(nivel) + "]" for nivel in niveis_carga(list(csv_tables), dependencias_fk())
+    ))
+
+
+def carregar_dados(backend, tamanho_chunk=TAMANHO_CHUNK, diretorio=DIRETORIO_CSV, modo="colunar",
+                   n_workers=N_WORKERS, diretorio_estado=DIRETORIO_ESTADO):
+    """
+    Carga completa em paralelo respeitando as FKs. No modo colunar grava o estado
+    usado pela carga incremental. Retorna {tabela: (linhas, segundos)}.
+    """
+    _imprimir_niveis()
+
+    def carregar(conn, nome_tabela):
+        # A tabela foi recriada: o estado anterior deixa de valer
+        remover_estado(diretorio_estado, nome_tabela)
+        digitais = [] if modo == "colunar" else None
+        try:
+            log(f"Inserindo dados de {nome_tabela}.csv em chunks de {tamanho_chunk} linhas...")
+            linhas, segundos = carregar_tabela(backend, conn, nome_tabela, tamanho_chunk, diretorio, modo, digitais)
+            log(f"Dados inseridos com sucesso em {nome_tabela}: "
+                f"{linhas} linhas em {segundos:.2f}s ({linhas / max(segundos, 1e-9):,.0f} linhas/s).")
+        except FileNotFoundError:
+            log(f"Arquivo {nome_tabela}.csv não encontrado.")
+            return None
+        except Exception as e:
+            conn.rollback()
+            log(f"Erro geral ao inserir dados em {nome_tabela}: {e}")
+            return None
+        if digitais is not None:
+            salvar_estado(diretorio_estado, nome_tabela, backend.destino, *_juntar_digitais(digitais))
+        return linhas, segundos
+
+    inicio = time.perf_counter()
+    metricas = _por_dependencia(backend, carregar, n_workers)
+    total = time.perf_counter() - inicio
+    soma = sum(segundos for _, segundos in metricas.values())
+    print(f"\nCarga concluída em {total:.2f}s com {n_workers} workers (soma das tabelas: {soma:.2f}s).")
+    return metricas
+
+
+def comparar_tabela(nome_tabela, estado, tamanho_chunk=TAMANHO_CHUNK, diretorio=DIRETORIO_CSV):
+    """
+    Compara o CSV com o estado da última carga, chunk a chunk e vetorizado:
+    PK ausente do estado = insert; PK presente com hash diferente = update;
+    PK do estado ausente do CSV = delete. Sem estado, todas as linhas viram
+    upsert e não há deletes. Retorna (linhas alteradas, nº de inserts, PKs removidas,
+    pks, hashes).
+    """
+    pk = chave_primaria(csv_tables[nome_tabela])
+    alteradas = []
+    n_novas = 0
+    digitais = []
+    for chunk in ler_csv_tipado(nome_tabela, tamanho_chunk, diretorio):
+        pks, hashes = impressoes(chunk, pk)
+        digitais.append((pks, hashes))
+        if estado is None or len(estado[0]) == 0:
+            alteradas.append(chunk)
+            n_novas += len(chunk)
+            continue
+        pks_ant, hashes_ant = estado
+        pos = np.minimum(np.searchsorted(pks_ant, pks), len(pks_ant) - 1)
+        nova = pks_ant[pos] != pks
+        mudou = nova | (hashes_ant[pos] != hashes)
+        n_novas += int(nova.sum())
+        if mudou.any():
+            alteradas.append(chunk[mudou])
+
+    pks, hashes = _juntar_digitais(digitais)
+    removidas = np.empty(0, dtype=np.int64) if estado is None else np.setdiff1d(estado[0], pks)
+    alteradas = pd.concat(alteradas, ignore_index=True) if alteradas else None
+    return alteradas, n_novas, removidas, pks, hashes
+
+
+def aplicar_upserts(backend, conn, nome_tabela, alteradas, tamanho_chunk=TAMANHO_CHUNK):
+    """
+    Sobe as linhas alteradas para uma staging e aplica tudo com um MERGE
+    """
+    if alteradas is None or alteradas.empty:
+        return
+    pk = chave_primaria(csv_tables[nome_tabela])
+    colunas = list(alteradas.columns)
+    cursor = conn.cursor()
+    backend.preparar_cursor(cursor)
+    staging = backend.criar_staging(cursor, nome_tabela, colunas)
+    for inicio in range(0, len(alteradas), tamanho_chunk):
+        inserir_chunk(backend, cursor, staging, nome_tabela, alteradas.iloc[inicio:inicio + tamanho_chunk])
+    backend.mesclar(cursor, nome_tabela, staging, pk, colunas)
+    backend.descartar_staging(cursor, staging)
+    conn.commit()
+
+
+def aplicar_deletes(backend, conn, nome_tabela, removidas, tamanho_chunk=TAMANHO_CHUNK):
+    """
+    Sobe as PKs removidas para uma staging e apaga com um único DELETE
+    """
+    if len(removidas) == 0:
+        return
+    pk = chave_primaria(csv_tables[nome_tabela])
+    cursor = conn.cursor()
+    backend.preparar_cursor(cursor)
+    staging = backend.criar_staging(cursor, nome_tabela, [pk], sufixo="del")
+    backend.definir_tipos(cursor, [("INT", 0, 0)])
+    for inicio in range(0, len(removidas), tamanho_chunk):
+        cursor.executemany(
+            f"INSERT INTO {staging} ({pk}) VALUES (?)",
+            [(chave,) for chave in removidas[inicio:inicio + tamanho_chunk].tolist()],
+        )
+    cursor.execute(f"DELETE FROM {nome_tabela} WHERE {pk} IN (SELECT {pk} FROM {staging})")
+    backend.descartar_staging(cursor, staging)
+    conn.commit()
+
+
+def atualizar_dados(backend, tamanho_chunk=TAMANHO_CHUNK, diretorio=DIRETORIO_CSV, n_workers=N_WORKERS,
+                    diretorio_estado=DIRETORIO_ESTADO):
+    """
+    Carga incremental: compara cada CSV com o estado salvo, aplica inserts e
+    updates dos pais para os filhos e depois os deletes dos filhos para os pais.
+    O estado só é atualizado para as tabelas em que tudo deu certo.
+    Retorna {tabela: (inserts, updates, deletes, segundos)}.
+    """
+    _imprimir_niveis()
+    inicio = time.perf_counter()
+    pendencias = {}
+
+    def upsert(conn, nome_tabela):
+        comeco = time.perf_counter()
+        try:
+            estado = carregar_estado(diretorio_estado, nome_tabela, backend.destino)
+            if estado is not None:
+                # O estado só vale se a tabela ainda tiver as linhas dele (ex.: tabela recriada por fora)
+                cursor = conn.cursor()
+                cursor.execute(f"SELECT COUNT(*) FROM {nome_tabela}")
+                n_banco = cursor.fetchone()[0]
+                if n_banco != len(estado[0]):
+                    log(f"{nome_tabela}: estado com {len(estado[0])} linhas, banco com {n_banco}; estado descartado.")
+                    estado = None
+            alteradas, n_novas, removidas, pks, hashes = comparar_tabela(nome_tabela, estado, tamanho_chunk, diretorio)
+            n_alteradas = 0 if alteradas is None else len(alteradas) - n_novas
+            aplicar_upserts(backend, conn, nome_tabela, alteradas, tamanho_chunk)
+        except FileNotFoundError:
+            log(f"Arquivo {nome_tabela}.csv não encontrado.")
+            return None
+        except Exception as e:
+            conn.rollback()
+            log(f"Erro ao aplicar inserts/updates em {nome_tabela}: {e}")
+            return None
+        if estado is None:
+            log(f"{nome_tabela}: sem estado anterior, MERGE de todas as {n_novas} linhas.")
+        else:
+            log(f"{nome_tabela}: {n_novas} inserts, {n_alteradas} updates, {len(removidas)} deletes pendentes.")
+        pendencias[nome_tabela] = (removidas, pks, hashes, n_novas, n_alteradas, time.perf_counter() - comeco)
+        return n_novas
+
+    def delete(conn, nome_tabela):
+        if nome_tabela not in pendencias:
+            return None
+        removidas, pks, hashes, n_novas, n_alteradas, segundos = pendencias[nome_tabela]
+        comeco = time.perf_counter()
+        try:
+            aplicar_deletes(backend, conn, nome_tabela, removidas, tamanho_chunk)
+        except Exception as e:
+            conn.rollback()
+            log(f"Erro ao remover linhas de {nome_tabela}: {e}")
+            return None
+        salvar_estado(diretorio_estado, nome_tabela, backend.destino, pks, hashes)
+        return n_novas, n_alteradas, len(removidas), segundos + time.perf_counter() - comeco
+
+    _por_dependencia(backend, upsert, n_workers)
+    metricas = _por_dependencia(backend, delete, n_workers, reverso=True)
+
+    print("\nResumo da carga incremental:")
+    for nome_tabela in csv_tables:
+        if nome_tabela in metricas:
+            n_novas, n_alteradas, n_removidas, segundos = metricas[nome_tabela]
+            print(f"  {nome_tabela:<12} inserts: {n_novas:>8}  updates: {n_alteradas:>8}  "
+                  f"deletes: {n_removidas:>8}  {segundos:.2f}s")
+    print(f"Carga incremental concluída em {time.perf_counter() - inicio:.2f}s.")
+    return metricas
+
+
+def _em_paralelo(backend, tarefa, itens, n_workers):
+    """
+    Executa tarefa(conn, item) para cada item no pool, com uma conexão por worker
+    """
+    conexoes = ConexoesPorThread(backend)
+    try:
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            return dict(zip(itens, pool.map(lambda item: tarefa(conexoes.obter(), item), itens)))
+    finally:
+        conexoes.fechar()
+
+
+def criar_indices(backend, constraints="imediatas", n_workers=N_WORKERS):
+    """
+    Pós-carga, uma tarefa por tabela em paralelo: PK (se adiada) e índice em cada
+    coluna de FK. Retorna {tabela: segundos}.
+    """
+    colunas_fk = {}
+    for filha, coluna, _, _, _ in relacoes_fk():
+        colunas_fk.setdefault(filha, []).append(coluna)
+
+    def indexar(conn, nome_tabela):
+        cursor = conn.cursor()
+        inicio = time.perf_counter()
+        criados = []
+        try:
+            if constraints == "adiadas":
+                backend.criar_chave_primaria(cursor, nome_tabela, chave_primaria(csv_tables[nome_tabela]))
+                criados.append(f"pk_{nome_tabela}")
+            for coluna in colunas_fk.get(nome_tabela, []):
+                backend.criar_indice(cursor, nome_tabela, coluna)
+                criados.append(f"ix_{nome_tabela}_{coluna}")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            log(f"Erro ao criar índices de {nome_tabela}: {e}")
+            return None
+        segundos = time.perf_counter() - inicio
+        log(f"Índices de {nome_tabela} em {segundos:.2f}s: "
+            f"{', '.join(criados) or 'nenhum'}.")
+        return segundos
+
+    print("\nCriando índices...")
+    return _em_paralelo(backend, indexar, list(csv_tables), n_workers)
+
+
+def adicionar_fks(backend, n_workers=N_WORKERS):
+    """
+    Aplica as FKs em paralelo, agrupadas por tabela filha (ALTERs na mesma tabela
+    disputariam o mesmo lock de schema). Precisa das PKs já criadas.
+    """
+    por_tabela = {}
+    for filha, _, _, _, fk in relacoes_fk():
+        por_tabela.setdefault(filha, []).append(fk)
+
+    def aplicar(conn, nome_tabela):
+        cursor = conn.cursor()
+        inicio = time.perf_counter()
+        for fk in por_tabela[nome_tabela]:
+            try:
+                if backend.adicionar_fk(cursor, fk):
+                    conn.commit()
+                    log(f"Executado: {fk}")
+                else:
+                    log(f"Ignorado ({backend.nome} não suporta ADD CONSTRAINT): {fk}")
+            except Exception as e:
+                conn.rollback()
+                log(f"Erro ao adicionar FK: {fk} -> {e}")
+        return time.perf_counter() - inicio
+
+    print("\nAdicionando FKs...")
+    return _em_paralelo(backend, aplicar, list(por_tabela), n_workers)
+
+
+def pos_carga(backend, constraints="imediatas", n_workers=N_WORKERS):
+    """
+    Fase pós-carga: índices (e PKs adiadas) e depois as FKs, com os tempos por tabela
+    """
+    inicio = time.perf_counter()
+    indices = criar_indices(backend, constraints, n_workers)
+    fks_por_tabela = adicionar_fks(backend, n_workers)
+
+    print("\nTempos da fase pós-carga:")
+    for nome_tabela in csv_tables:
+        segundos = indices.get(nome_tabela)
+        texto_indices = f"{segundos:.2f}s" if segundos is not None else "erro"
+        texto_fks = f"{fks_por_tabela[nome_tabela]:.2f}s" if nome_tabela in fks_por_tabela else "-"
+        print(f"  {nome_tabela:<12} índices: {texto_indices:>7}  FKs: {texto_fks:>7}")
+    print(f"Fase pós-carga concluída em {time.perf_counter() - inicio:.2f}s.")
+    return indices, fks_por_tabela
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga dos CSVs de banco_eng_dados no banco de dados")
+    parser.add_argument("--backend", choices=["sqlserver", "sqlite"], default="sqlserver")
+    parser.add_argument("--sqlite-db", default="projeto_ed.db", help="arquivo usado pelo backend sqlite")
+    parser.add_argument("--chunk", type=int, default=TAMANHO_CHUNK, help="linhas por chunk (e por commit)")
+    parser.add_argument("--diretorio", default=DIRETORIO_CSV)
+    parser.add_argument("--modo", choices=MODOS_CARGA, default="colunar",
+                        help="colunar: tipos da DDL e conversão por coluna; tuplas: conversão célula a célula")
+    parser.add_argument("--workers", type=int, default=N_WORKERS,
+                        help="tabelas carregadas ao mesmo tempo, cada uma com a sua conexão")
+    parser.add_argument("--constraints", choices=MODOS_CONSTRAINTS, default="imediatas",
+                        help="adiadas: carrega tabelas heap e cria as PKs junto com os índices após a carga")
+    parser.add_argument("--atualizacao", choices=MODOS_ATUALIZACAO, default="completa",
+                        help="incremental: aplica só as linhas novas, alteradas e removidas desde a última carga")
+    parser.add_argument("--estado", default=DIRETORIO_ESTADO, help="diretório do estado da carga incremental")
+    parser.add_argument("--sem-validacao", action="store_true",
+                        help="não valida PKs e FKs dos CSVs antes da carga")
+    args = parser.parse_args()
+
+    # Rejeita CSVs inconsistentes antes de tocar no banco
+    if not args.sem_validacao and validar_integridade(args.diretorio):
+        print("\nCarga cancelada: corrija os CSVs ou use --sem-validacao.")
+        sys.exit(1)
+
+    # Conexão com o banco de dados
+    try:
+        backend = BackendSQLServer() if args.backend == "sqlserver" else BackendSQLite(args.sqlite_db)
+        conn = backend.conectar()
+        print(f"Conexão com o banco de dados ({backend.nome}) estabelecida com sucesso.")
+    except Exception as e:
+        print("Erro ao conectar no banco de dados:", e)
+        sys.exit(1)
 
-conn = sqlite3.connect('livraria.db')
+    if args.atualizacao == "incremental":
+        for nome_tabela in garantir_tabelas(backend, conn, args.constraints):
+            remover_estado(args.estado, nome_tabela)
+        conn.close()
+        atualizar_dados(backend, args.chunk, args.diretorio, args.workers, args.estado)
+    else:
+        criar_tabelas(backend, conn, args.constraints, args.estado)
+        conn.close()
+        carregar_dados(backend, args.chunk, args.diretorio, args.modo, args.workers, args.estado)
+    pos_carga(backend, args.constraints, args.workers)
 
-tabelas = ['cliente', 'endereco', 'autor', 'editora', 'livro', 'pedido', 'item_pedido', 'estoque', 'pagamento', 'categoria', 'tipo_pagamento']
+    print("\nFinalizado com sucesso.")
 
-for tabela in tabelas:
-    df = pd.read_sql_query(f"SELECT * FROM {tabela}", conn)
-    df.to_csv(f"{tabela}.csv", index=False)
 
-conn.close()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark da carga dos CSVs: caminho colunar (tipos da DDL, conversão por coluna)
+contra o caminho antigo de tuplas (conversão célula a célula).
+
+Mede separadamente o tempo de conversão dos chunks (sem banco) e a carga
+completa no backend SQLite, que roda sem o SQL Server:
+
+    python banco_eng_dados/benchmark_carga.py --tabelas item_pedido pagamento
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from Script import (
+    DIRETORIO_CSV, DTYPES_CSV, MODOS_CARGA, TAMANHO_CHUNK, BackendSQLite,
+    carregar_tabela, csv_tables, linhas_colunar, linhas_tuplas, tipos_colunas,
+)
+
+
+def medir_conversao(nome_tabela, modo, tamanho_chunk, diretorio):
+    """
+    Tempo só da leitura + conversão dos chunks para parâmetros do executemany
+    """
+    leitura = {}
+    converter = linhas_tuplas
+    if modo == "colunar":
+        tipos = tipos_colunas(csv_tables[nome_tabela])
+        leitura["dtype"] = {coluna: DTYPES_CSV[tipo] for coluna, (tipo, _, _) in tipos.items()}
+        converter = linhas_colunar
+
+    inicio = time.perf_counter()
+    for chunk in pd.read_csv(os.path.join(diretorio, f"{nome_tabela}.csv"), chunksize=tamanho_chunk, **leitura):
+        converter(chunk)
+    return time.perf_counter() - inicio
+
+
+def medir_carga(nome_tabela, modo, tamanho_chunk, diretorio):
+    """
+    Tempo da carga completa em um banco SQLite temporário
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = BackendSQLite(os.path.join(tmp, "benchmark.db"))
+        conn = backend.conectar()
+        backend.recriar_tabela(conn.cursor(), nome_tabela, csv_tables[nome_tabela])
+        linhas, segundos = carregar_tabela(backend, conn, nome_tabela, tamanho_chunk, diretorio, modo)
+        conn.close()
+    return linhas, segundos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os modos de carga colunar e tuplas")
+    parser.add_argument("--tabelas", nargs="+", default=list(csv_tables), choices=list(csv_tables))
+    parser.add_argument("--chunk", type=int, default=TAMANHO_CHUNK)
+    parser.add_argument("--diretorio", default=DIRETORIO_CSV)
+    parser.add_argument("--repeticoes", type=int, default=3, help="usa o melhor tempo de N execuções")
+    args = parser.parse_args()
+
+    print(f"{'tabela':<12} {'modo':<8} {'linhas':>9} {'conversão (s)':>14} {'carga (s)':>10} {'linhas/s':>12}")
+    for nome_tabela in args.tabelas:
+        for modo in MODOS_CARGA:
+            conversao = min(medir_conversao(nome_tabela, modo, args.chunk, args.diretorio)
+                            for _ in range(args.repeticoes))
+            linhas, carga = min((medir_carga(nome_tabela, modo, args.chunk, args.diretorio)
+                                 for _ in range(args.repeticoes)), key=lambda r: r[1])
+            print(f"{nome_tabela:<12} {modo:<8} {linhas:>9} {conversao:>14.3f} {carga:>10.3f} "
+                  f"{linhas / max(carga, 1e-9):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
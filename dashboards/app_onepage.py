@@ -4,7 +4,13 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import numpy as np
-from dados import get_all_data
+import os
+
+# Fonte dos dados: 'mock' (dados.py, padrão) ou 'real' (dados_reais.py, CSVs/Gold)
+if os.getenv('DASHBOARD_FONTE', 'mock') == 'real':
+    from dados_reais import get_all_data
+else:
+    from dados import get_all_data
 
 # Configuração da página
 st.set_page_config(
@@ -1082,7 +1088,7 @@ st.markdown("##  Indicadores-Chave de Performance (KPIs)")
 # Calcular KPIs baseados nos dados reais do banco
 total_pedidos = df_vendas['pedidos'].sum()
 receita_total = df_vendas['receita'].sum()
-total_clientes = 15000  # Baseado nos dados do banco
+total_clientes = kpis.get('total_clientes', 15000)  # Baseado nos dados do banco
 total_editoras = kpis.get('total_editoras', 20)
 ticket_medio = receita_total / total_pedidos if total_pedidos > 0 else 0
 total_itens = df_vendas['itens_vendidos'].sum()
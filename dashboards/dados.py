@@ -24,78 +24,66 @@ from faker import Faker
 # Configurar seeds para reprodutibilidade
 random.seed(42)
 np.random.seed(42)
+rng = np.random.default_rng(42)
 fake = Faker('pt_BR')
 
-def get_vendas_temporais():
+def get_vendas_temporais(data_inicio=None, data_fim=None, granularidade='D'):
     """
-    Gera dados temporais de vendas baseados nos pedidos
+    Gera dados temporais de vendas baseados nos pedidos.
+    Vetorizado: aceita qualquer período (padrão: últimos 12 meses) e
+    granularidade 'D' (diária), 'W' (semanal) ou 'M' (mensal).
     """
-    # Período de análise: últimos 12 meses
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=365)
+    end_date = pd.Timestamp(data_fim) if data_fim is not None else pd.Timestamp(datetime.now())
+    start_date = pd.Timestamp(data_inicio) if data_inicio is not None else end_date - timedelta(days=365)
     dates = pd.date_range(start=start_date, end=end_date, freq='D')
-    
-    vendas_diarias = []
-    
-    for date in dates:
-        # Simular sazonalidade
-        base_pedidos = random.randint(15, 45)
-        
-        # Fins de semana têm mais vendas
-        if date.weekday() >= 5:
-            base_pedidos = int(base_pedidos * 1.3)
-            
-        # Calcular métricas
-        itens_por_pedido = random.uniform(1.2, 3.0)
-        preco_medio = random.uniform(50, 150)
-        
-        total_itens = int(base_pedidos * itens_por_pedido)
-        receita_dia = base_pedidos * itens_por_pedido * preco_medio
-        
-        vendas_diarias.append({
-            'data': date,
-            'pedidos': base_pedidos,
-            'itens_vendidos': total_itens,
-            'receita': receita_dia,
-            'mes': date.strftime('%Y-%m')
-        })
-    
-    return pd.DataFrame(vendas_diarias)
+    n = len(dates)
+
+    # Simular sazonalidade: fins de semana têm mais vendas
+    base_pedidos = rng.integers(15, 46, n)
+    base_pedidos = np.where(dates.weekday >= 5, (base_pedidos * 1.3).astype(int), base_pedidos)
+
+    # Calcular métricas
+    itens_por_pedido = rng.uniform(1.2, 3.0, n)
+    preco_medio = rng.uniform(50, 150, n)
+
+    vendas = pd.DataFrame({
+        'data': dates,
+        'pedidos': base_pedidos,
+        'itens_vendidos': (base_pedidos * itens_por_pedido).astype(int),
+        'receita': base_pedidos * itens_por_pedido * preco_medio,
+    })
 
-def get_produtos_performance():
+    if granularidade != 'D':
+        frequencia = {'W': 'W', 'M': 'MS'}[granularidade]
+        vendas = vendas.resample(frequencia, on='data').sum().reset_index()
+
+    vendas['mes'] = vendas['data'].dt.to_period('M').astype(str)
+    return vendas
+
+def get_produtos_performance(n_livros=100):
     """
-    Gera dados de livros baseados na estrutura real
+    Gera dados de livros baseados na estrutura real (vetorizado, n_livros livros)
     """
-    generos = ['Romance', 'Ficção', 'Biografia', 'Autoajuda', 'História', 'Técnico', 'Infantil']
-    editoras = ['Companhia das Letras', 'Record', 'Globo', 'Intrínseca', 'Suma', 'Rocco']
-    
-    livros_data = []
-    
-    for i in range(100):
-        genero = random.choice(generos)
-        editora = random.choice(editoras)
-        
-        # Gerar dados do livro
-        titulo = f"Livro {i+1}"
-        autor = f"Autor {random.randint(1, 50)}"
-        ano = random.randint(2015, 2024)
-        preco = round(random.uniform(25, 200), 2)
-        vendas = random.randint(50, 1000)
-        
-        livros_data.append({
-            'id_livro': i + 1,
-            'titulo': titulo,
-            'autor': autor,
-            'editora': editora,
-            'genero': genero,
-            'ano_publicacao': ano,
-            'preco': preco,
-            'vendas_total': vendas,
-            'receita_total': vendas * preco,
-            'avaliacoes': round(random.uniform(3.0, 5.0), 1)
-        })
-    
-    return pd.DataFrame(livros_data)
+    generos = np.array(['Romance', 'Ficção', 'Biografia', 'Autoajuda', 'História', 'Técnico', 'Infantil'])
+    editoras = np.array(['Companhia das Letras', 'Record', 'Globo', 'Intrínseca', 'Suma', 'Rocco'])
+    autores = np.array([f"Autor {i}" for i in range(1, 51)])
+
+    ids = np.arange(1, n_livros + 1)
+    preco = np.round(rng.uniform(25, 200, n_livros), 2)
+    vendas = rng.integers(50, 1001, n_livros)
+
+    return pd.DataFrame({
+        'id_livro': ids,
+        'titulo': np.char.add('Livro ', ids.astype(str)),
+        'autor': pd.Categorical.from_codes(rng.integers(0, len(autores), n_livros), autores),
+        'editora': pd.Categorical.from_codes(rng.integers(0, len(editoras), n_livros), editoras),
+        'genero': pd.Categorical.from_codes(rng.integers(0, len(generos), n_livros), generos),
+        'ano_publicacao': rng.integers(2015, 2025, n_livros),
+        'preco': preco,
+        'vendas_total': vendas,
+        'receita_total': vendas * preco,
+        'avaliacoes': np.round(rng.uniform(3.0, 5.0, n_livros), 1)
+    })
 
 def get_dados_operacionais():
     """
@@ -174,12 +162,12 @@ def get_kpis_principais():
         'satisfacao_cliente': round(random.uniform(85, 95), 1)
     }
 
-def get_all_data():
+def get_all_data(data_inicio=None, data_fim=None, granularidade='D', n_livros=100):
     """
     Retorna todos os datasets mockados
     """
-    vendas = get_vendas_temporais()
-    produtos = get_produtos_performance()
+    vendas = get_vendas_temporais(data_inicio, data_fim, granularidade)
+    produtos = get_produtos_performance(n_livros)
     operacionais = get_dados_operacionais()
     kpis = get_kpis_principais()
     
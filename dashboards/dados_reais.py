@@ -0,0 +1,226 @@
+"""
+Camada de acesso aos dados reais do dashboard.
+
+Calcula os mesmos datasets de dados.get_all_data() (vendas_temporais,
+produtos, pedidos_status, pagamentos, estoque e kpis) a partir das tabelas
+pedido, item_pedido, pagamento, livro, estoque, autor, editora e cliente,
+com joins e group-bys vetorizados do pandas.
+
+Por padrão lê os CSVs de banco_eng_dados/, mas qualquer diretório com as
+mesmas tabelas em {tabela}.csv ou {tabela}.parquet (ex.: extração da Gold)
+pode ser usado. Os agregados ficam em cache em disco, identificados pelo
+tamanho e data de modificação dos arquivos de origem: quando um arquivo muda
+o cache é recalculado automaticamente; invalidar_cache() força o recálculo.
+"""
+
+import glob
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+DIRETORIO_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'banco_eng_dados')
+DIRETORIO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+
+# Colunas lidas de cada tabela (só o necessário para os agregados)
+COLUNAS = {
+    'pedido': ['id_pedido', 'id_cliente', 'data', 'status'],
+    'item_pedido': ['id_pedido', 'id_livro', 'quantidade', 'preco_unitario'],
+    'pagamento': ['id_pagamento', 'forma_pagamento', 'valor_total'],
+    'livro': ['id_livro', 'titulo', 'id_autor', 'id_editora', 'ano_publicacao'],
+    'estoque': ['id_livro', 'quantidade'],
+    'autor': ['id_autor', 'nome'],
+    'editora': ['id_editora', 'nome'],
+    'cliente': ['id_cliente'],
+}
+
+# Faixas de quantidade em estoque: (status, limite superior inclusivo)
+FAIXAS_ESTOQUE = [
+    ('Sem Estoque', 0),
+    ('Estoque Baixo', 20),
+    ('Estoque Normal', 80),
+    ('Estoque Alto', np.inf),
+]
+
+# O modelo relacional não tem gênero/categoria de livro
+GENERO_PADRAO = 'Não informado'
+
+
+def _arquivo_da_tabela(diretorio, tabela):
+    for extensao in ('parquet', 'csv'):
+        caminho = os.path.join(diretorio, f'{tabela}.{extensao}')
+        if os.path.exists(caminho):
+            return caminho
+    raise FileNotFoundError(f"Tabela '{tabela}' não encontrada em {diretorio}")
+
+
+def _assinatura(diretorio):
+    """
+    Identifica a versão dos dados de origem pelo nome, tamanho e data de modificação
+    """
+    partes = []
+    for tabela in sorted(COLUNAS):
+        info = os.stat(_arquivo_da_tabela(diretorio, tabela))
+        partes.append(f'{tabela}:{info.st_size}:{info.st_mtime_ns}')
+    return hashlib.sha1('|'.join(partes).encode()).hexdigest()[:16]
+
+
+def carregar_tabelas(diretorio=DIRETORIO_DADOS):
+    """
+    Lê as tabelas de origem (apenas as colunas usadas)
+    """
+    tabelas = {}
+    for tabela, colunas in COLUNAS.items():
+        caminho = _arquivo_da_tabela(diretorio, tabela)
+        if caminho.endswith('.parquet'):
+            tabelas[tabela] = pd.read_parquet(caminho, columns=colunas)
+        else:
+            tabelas[tabela] = pd.read_csv(caminho, usecols=colunas)
+    tabelas['pedido']['data'] = pd.to_datetime(tabelas['pedido']['data'])
+    return tabelas
+
+
+def _vendas_temporais(pedido, itens_por_pedido):
+    """
+    Vendas diárias (pedidos não cancelados), com dias sem venda zerados
+    """
+    vendas = pedido[pedido['status'] != 'Cancelado'].merge(itens_por_pedido, on='id_pedido', how='left')
+    diario = vendas.groupby('data').agg(
+        pedidos=('id_pedido', 'size'),
+        itens_vendidos=('itens', 'sum'),
+        receita=('receita', 'sum'),
+    )
+    if len(diario):
+        dias = pd.date_range(diario.index.min(), diario.index.max(), freq='D')
+        diario = diario.reindex(dias, fill_value=0)
+    diario = diario.rename_axis('data').reset_index()
+    diario['itens_vendidos'] = diario['itens_vendidos'].astype(int)
+    diario['mes'] = diario['data'].dt.to_period('M').astype(str)
+    return diario
+
+
+def _produtos(livro, autor, editora, item_pedido):
+    """
+    Desempenho por livro: unidades vendidas, receita e preço médio praticado
+    """
+    item_pedido = item_pedido.assign(receita=item_pedido['quantidade'] * item_pedido['preco_unitario'])
+    por_livro = item_pedido.groupby('id_livro').agg(
+        vendas_total=('quantidade', 'sum'),
+        receita_total=('receita', 'sum'),
+    )
+
+    produtos = (
+        livro
+        .merge(autor.rename(columns={'nome': 'autor'}), on='id_autor', how='left')
+        .merge(editora.rename(columns={'nome': 'editora'}), on='id_editora', how='left')
+        .merge(por_livro, on='id_livro', how='left')
+    )
+    produtos[['vendas_total', 'receita_total']] = produtos[['vendas_total', 'receita_total']].fillna(0)
+    produtos['vendas_total'] = produtos['vendas_total'].astype(int)
+    produtos['preco'] = np.round(
+        produtos['receita_total'] / produtos['vendas_total'].where(produtos['vendas_total'] > 0), 2
+    )
+    produtos['genero'] = GENERO_PADRAO
+    # Não há avaliações no modelo relacional
+    produtos['avaliacoes'] = np.nan
+    return produtos[[
+        'id_livro', 'titulo', 'autor', 'editora', 'genero', 'ano_publicacao',
+        'preco', 'vendas_total', 'receita_total', 'avaliacoes',
+    ]]
+
+
+def _estoque(estoque):
+    limites = [-np.inf] + [limite for _, limite in FAIXAS_ESTOQUE]
+    nomes = [status for status, _ in FAIXAS_ESTOQUE]
+    faixas = pd.cut(estoque['quantidade'], bins=limites, labels=nomes)
+    contagem = faixas.value_counts().reindex(nomes, fill_value=0)
+    return pd.DataFrame({'status': nomes, 'quantidade': contagem.to_numpy()})
+
+
+def _crescimento_vendas(vendas, dias=30):
+    """
+    Variação (%) da receita dos últimos `dias` dias contra o período anterior
+    """
+    if vendas.empty:
+        return 0.0
+    fim = vendas['data'].max()
+    atual = vendas.loc[vendas['data'] > fim - pd.Timedelta(days=dias), 'receita'].sum()
+    anterior = vendas.loc[
+        (vendas['data'] <= fim - pd.Timedelta(days=dias))
+        & (vendas['data'] > fim - pd.Timedelta(days=2 * dias)), 'receita'
+    ].sum()
+    return round(float(atual / anterior - 1) * 100, 1) if anterior else 0.0
+
+
+def calcular_agregados(tabelas):
+    """
+    Calcula todos os datasets do dashboard a partir das tabelas carregadas
+    """
+    item_pedido = tabelas['item_pedido']
+    pedido = tabelas['pedido']
+
+    itens_por_pedido = (
+        item_pedido
+        .assign(receita=item_pedido['quantidade'] * item_pedido['preco_unitario'])
+        .groupby('id_pedido')
+        .agg(itens=('quantidade', 'sum'), receita=('receita', 'sum'))
+        .reset_index()
+    )
+    vendas = _vendas_temporais(pedido, itens_por_pedido)
+
+    pedidos_status = pedido['status'].value_counts().rename_axis('status').reset_index(name='quantidade')
+
+    pagamentos = (
+        tabelas['pagamento']
+        .groupby('forma_pagamento')
+        .agg(total_transacoes=('id_pagamento', 'size'), receita_total=('valor_total', 'sum'))
+        .reset_index()
+        .sort_values('total_transacoes', ascending=False, ignore_index=True)
+    )
+
+    kpis = {
+        'total_clientes': int(tabelas['cliente']['id_cliente'].nunique()),
+        'total_editoras': int(tabelas['editora']['id_editora'].nunique()),
+        'total_autores': int(tabelas['autor']['id_autor'].nunique()),
+        'total_livros': int(tabelas['livro']['id_livro'].nunique()),
+        'crescimento_vendas': _crescimento_vendas(vendas),
+        # Sem pesquisa de satisfação no modelo: usa o % de pedidos não cancelados
+        'satisfacao_cliente': round(float((pedido['status'] != 'Cancelado').mean() * 100), 1) if len(pedido) else 0.0,
+    }
+
+    return {
+        'vendas_temporais': vendas,
+        'produtos': _produtos(tabelas['livro'], tabelas['autor'], tabelas['editora'], item_pedido),
+        'pedidos_status': pedidos_status,
+        'pagamentos': pagamentos,
+        'estoque': _estoque(tabelas['estoque']),
+        'kpis': kpis,
+    }
+
+
+def invalidar_cache(diretorio_cache=DIRETORIO_CACHE):
+    """
+    Remove os agregados em cache, forçando o recálculo na próxima leitura
+    """
+    for caminho in glob.glob(os.path.join(diretorio_cache, 'agregados_*.pkl')):
+        os.remove(caminho)
+
+
+def get_all_data(diretorio=DIRETORIO_DADOS, usar_cache=True, diretorio_cache=DIRETORIO_CACHE):
+    """
+    Retorna todos os datasets do dashboard calculados a partir dos dados reais
+    """
+    if not usar_cache:
+        return calcular_agregados(carregar_tabelas(diretorio))
+
+    caminho_cache = os.path.join(diretorio_cache, f'agregados_{_assinatura(diretorio)}.pkl')
+    if os.path.exists(caminho_cache):
+        return pd.read_pickle(caminho_cache)
+
+    dados = calcular_agregados(carregar_tabelas(diretorio))
+    # Mantém só a versão atual em disco
+    invalidar_cache(diretorio_cache)
+    os.makedirs(diretorio_cache, exist_ok=True)
+    pd.to_pickle(dados, caminho_cache)
+    return dados
@@ -1,14 +1,694 @@
 import pandas as pd
-from azure.identity import DefaultAzureCredential
-from azure.storage.filedatalake import DataLakeServiceClient
-from azure.core.exceptions import ResourceExistsError
-from sqlalchemy import create_engine
 
+import argparse
+import hashlib
+import itertools
+import json
 import os
+import posixpath
+import queue
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
 
-def elt_sql_sqlserver_to_adls():
+from armazenamento import SUFIXO_TEMPORARIO, Manifesto, abrir_armazenamento
+
+# Linhas por chunk lido do banco (e enviado ao ADLS); sobrescrito por SQL_CHUNK_SIZE
+TAMANHO_CHUNK = 50000
+# Conexões mínimas no pool da engine (no pipeline, no mínimo uma por worker de
+# extração mais uma para as consultas de metadados)
+TAMANHO_POOL = 5
+# Modo pipeline: workers de extração, workers de upload e chunks em memória na fila
+WORKERS_EXTRACAO = 3
+WORKERS_UPLOAD = 4
+MAX_FILA = 8
+# Formato dos arquivos na landing; no Parquet, compressão e linhas por row group
+FORMATOS = ["csv", "parquet"]
+COMPRESSAO_PARQUET = "zstd"
+LINHAS_POR_ROW_GROUP = 500000
+# Extração incremental: colunas de watermark das tabelas append-only (ids sempre crescentes).
+# Só o id: com a data (>=) o último dia inteiro voltaria a cada execução, sem dedup depois.
+# As demais tabelas continuam com extração completa a cada execução.
+COLUNAS_WATERMARK = {
+    "pedido": ["id_pedido"],
+    "pagamento": ["id_pagamento"],
+    "item_pedido": ["id_item"],
+}
+# Particionamento por faixa da chave primária: tabelas com faixa de chaves a partir de
+# MIN_CHAVES_PARTICAO são lidas em PARTICOES_EXTRACAO faixas, em paralelo e em conexões separadas
+PARTICOES_EXTRACAO = 4
+MIN_CHAVES_PARTICAO = 1000000
+TIPOS_INTEIROS = {"int", "integer", "bigint", "smallint", "tinyint"}
+ESTADO_WATERMARK = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".estado", "watermarks.json")
+
+
+class FonteSQLAlchemy:
+    """
+    SQL Server (ou qualquer URL do SQLAlchemy) com uma única engine com pool
+    de conexões, reaproveitada em todas as tabelas
+    """
+
+    def __init__(self, conn_str, tamanho_pool=TAMANHO_POOL):
+        from sqlalchemy import create_engine
+
+        self.engine = create_engine(conn_str, pool_size=tamanho_pool, max_overflow=0, pool_pre_ping=True)
+
+    def listar_tabelas(self, schema):
+        query = f"SELECT table_name FROM INFORMATION_SCHEMA.TABLES WHERE table_schema = '{schema}'"
+        print("📄 Executando consulta de tabelas:", query)
+        return pd.read_sql(query, self.engine)["table_name"].tolist()
+
+    def colunas(self, full_table_name):
+        """
+        Metadados das colunas: (nome, tipo, precisão, escala, aceita nulo)
+        """
+        schema, _, tabela = full_table_name.rpartition(".")
+        query = (
+            "SELECT column_name, data_type, numeric_precision, numeric_scale, is_nullable "
+            "FROM INFORMATION_SCHEMA.COLUMNS "
+            f"WHERE table_schema = '{schema or 'dbo'}' AND table_name = '{tabela}' ORDER BY ordinal_position"
+        )
+        return [
+            (nome, tipo, precisao, escala, anulavel == "YES")
+            for nome, tipo, precisao, escala, anulavel in pd.read_sql(query, self.engine).itertuples(index=False)
+        ]
+
+    def chave_primaria(self, full_table_name):
+        schema, _, tabela = full_table_name.rpartition(".")
+        query = (
+            "SELECT k.column_name FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS t "
+            "JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE k "
+            "ON k.constraint_name = t.constraint_name AND k.table_schema = t.table_schema "
+            f"WHERE t.constraint_type = 'PRIMARY KEY' AND t.table_schema = '{schema or 'dbo'}' "
+            f"AND t.table_name = '{tabela}' ORDER BY k.ordinal_position"
+        )
+        return pd.read_sql(query, self.engine)["column_name"].tolist()
+
+    def intervalo(self, full_table_name, coluna):
+        """
+        (MIN, MAX) da coluna, em uma consulta só
+        """
+        query = f"SELECT MIN({coluna}) AS minimo, MAX({coluna}) AS maximo FROM {full_table_name}"
+        return tuple(pd.read_sql(query, self.engine).iloc[0])
+
+    def extrair(self, full_table_name, tamanho_chunk=TAMANHO_CHUNK, filtro=None, parametros=None):
+        """
+        Lê a tabela (só as linhas do filtro, se houver) com cursor do lado do servidor
+        (stream_results), devolvendo DataFrames de até tamanho_chunk linhas sem
+        carregar a tabela inteira
+        """
+        from sqlalchemy import text
+
+        query = f"SELECT * FROM {full_table_name}" + (f" WHERE {filtro}" if filtro else "")
+        with self.engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True, max_row_buffer=tamanho_chunk)
+            yield from pd.read_sql(text(query), conn, params=parametros, chunksize=tamanho_chunk)
+
+    def fechar(self):
+        self.engine.dispose()
+
+
+class FonteSQLite:
+    """
+    Stand-in local para testes: lê as tabelas de um arquivo SQLite
+    (ex.: o gerado por banco_eng_dados/Script.py --backend sqlite)
+    """
+
+    def __init__(self, caminho_db):
+        self.caminho_db = caminho_db
+
+    def listar_tabelas(self, schema=None):
+        with sqlite3.connect(self.caminho_db) as conn:
+            query = "SELECT name AS table_name FROM sqlite_master WHERE type = 'table' ORDER BY name"
+            return pd.read_sql(query, conn)["table_name"].tolist()
+
+    def colunas(self, full_table_name):
+        """
+        Metadados das colunas a partir dos tipos declarados (ex.: DECIMAL(10,2))
+        """
+        with sqlite3.connect(self.caminho_db) as conn:
+            info = conn.execute(f"PRAGMA table_info({full_table_name})").fetchall()
+        colunas = []
+        for _, nome, declarado, notnull, _, pk in info:
+            m = re.match(r"\s*(\w+)\s*(?:\((\d+)\s*(?:,\s*(\d+))?\))?", declarado or "")
+            tipo, precisao, escala = m.groups() if m else ("", None, None)
+            colunas.append((nome, tipo, precisao and int(precisao), escala and int(escala), not (notnull or pk)))
+        return colunas
+
+    def chave_primaria(self, full_table_name):
+        with sqlite3.connect(self.caminho_db) as conn:
+            info = conn.execute(f"PRAGMA table_info({full_table_name})").fetchall()
+        return [nome for _, nome, _, _, _, pk in sorted(info, key=lambda c: c[5]) if pk]
+
+    def intervalo(self, full_table_name, coluna):
+        with sqlite3.connect(self.caminho_db) as conn:
+            return conn.execute(f"SELECT MIN({coluna}), MAX({coluna}) FROM {full_table_name}").fetchone()
+
+    def extrair(self, full_table_name, tamanho_chunk=TAMANHO_CHUNK, filtro=None, parametros=None):
+        # Uma conexão por extração: cada worker lê com a sua
+        conn = sqlite3.connect(self.caminho_db)
+        query = f"SELECT * FROM {full_table_name}" + (f" WHERE {filtro}" if filtro else "")
+        try:
+            yield from pd.read_sql(query, conn, params=parametros, chunksize=tamanho_chunk)
+        finally:
+            conn.close()
+
+    def fechar(self):
+        pass
+
+
+def esquema_arrow(colunas):
+    """
+    Schema do pyarrow a partir dos metadados das colunas da tabela de origem
+    """
+    import pyarrow as pa
+
+    inteiros = {"tinyint": pa.int16(), "smallint": pa.int16(), "int": pa.int32(), "integer": pa.int32(),
+                "bigint": pa.int64()}
+    campos = []
+    for nome, tipo, precisao, escala, anulavel in colunas:
+        tipo = (tipo or "").lower()
+        if tipo in inteiros:
+            arrow = inteiros[tipo]
+        elif tipo in ("decimal", "numeric", "money", "smallmoney"):
+            arrow = pa.decimal128(int(precisao or 19), int(escala or 4))
+        elif tipo in ("float", "double", "real"):
+            arrow = pa.float32() if tipo == "real" else pa.float64()
+        elif tipo == "bit":
+            arrow = pa.bool_()
+        elif tipo == "date":
+            arrow = pa.date32()
+        elif tipo in ("datetime", "datetime2", "smalldatetime", "timestamp"):
+            arrow = pa.timestamp("us")
+        else:
+            arrow = pa.string()
+        campos.append(pa.field(nome, arrow, nullable=anulavel))
+    return pa.schema(campos)
+
+
+class CodificadorCSV:
+    """
+    Chunks em CSV: cabeçalho só no primeiro
+    """
+
+    extensao = "csv"
+
+    def __init__(self):
+        self._cabecalho = True
+
+    def codificar(self, df):
+        data = df.to_csv(index=False, header=self._cabecalho).encode()
+        self._cabecalho = False
+        return data
+
+    def finalizar(self):
+        return b""
+
+
+class _BufferDrenavel:
+    """
+    Arquivo em memória para o ParquetWriter: os bytes escritos são retirados
+    (drenados) a cada row group e enviados, sem montar o arquivo inteiro
+    """
+
+    closed = False
+
+    def __init__(self):
+        self._partes = []
+        self._posicao = 0
+
+    def write(self, data):
+        self._partes.append(bytes(data))
+        self._posicao += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._posicao
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drenar(self):
+        data = b"".join(self._partes)
+        self._partes = []
+        return data
+
+
+class CodificadorParquet:
+    """
+    Chunks em Parquet tipado pelo schema da origem: acumula os chunks até
+    linhas_por_grupo linhas e grava um row group comprimido de cada vez
+    """
+
+    extensao = "parquet"
+
+    def __init__(self, schema, compressao=COMPRESSAO_PARQUET, linhas_por_grupo=LINHAS_POR_ROW_GROUP):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.schema = schema
+        self.linhas_por_grupo = linhas_por_grupo
+        self._pendentes = []
+        self._n_pendentes = 0
+        self._buffer = _BufferDrenavel()
+        self._escritor = pq.ParquetWriter(self._buffer, schema, compression=compressao)
+
+    def _tabela(self, df):
+        # Converte coluna a coluna para o tipo da origem (ex.: float -> decimal(10,2), texto -> date)
+        colunas = [
+            self._pa.array(df[campo.name], from_pandas=True).cast(campo.type)
+            for campo in self.schema
+        ]
+        return self._pa.Table.from_arrays(colunas, schema=self.schema)
+
+    def _gravar_pendentes(self):
+        if self._pendentes:
+            tabela = self._pa.concat_tables(self._pendentes)
+            self._escritor.write_table(tabela, row_group_size=self.linhas_por_grupo)
+            self._pendentes = []
+            self._n_pendentes = 0
+
+    def codificar(self, df):
+        self._pendentes.append(self._tabela(df))
+        self._n_pendentes += len(df)
+        if self._n_pendentes >= self.linhas_por_grupo:
+            self._gravar_pendentes()
+        return self._buffer.drenar()
+
+    def finalizar(self):
+        self._gravar_pendentes()
+        self._escritor.close()
+        return self._buffer.drenar()
+
+
+def criar_codificador(fonte, full_table_name, formato="csv", compressao=COMPRESSAO_PARQUET,
+                      linhas_por_grupo=LINHAS_POR_ROW_GROUP):
+    if formato == "parquet":
+        return CodificadorParquet(esquema_arrow(fonte.colunas(full_table_name)), compressao, linhas_por_grupo)
+    return CodificadorCSV()
+
+
+def _valor_json(valor):
+    # Escalares numpy/datas viram int ou texto ISO para o JSON de estado
+    valor = valor.item() if hasattr(valor, "item") else valor
+    return valor if isinstance(valor, int) else str(valor)
+
+
+def carregar_watermarks(caminho=ESTADO_WATERMARK):
+    """
+    {tabela: {coluna: maior valor já extraído}}
+    """
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def salvar_watermarks(watermarks, caminho=ESTADO_WATERMARK):
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    # Grava em arquivo temporário e renomeia para não expor um estado pela metade
+    temporario = caminho + f".{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(watermarks, f, indent=2, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def filtro_watermark(colunas, anteriores):
+    """
+    WHERE das linhas novas desde o último watermark: valores estritamente maiores,
+    para nenhuma linha já extraída voltar no delta seguinte
+    """
+    condicoes = []
+    parametros = {}
+    for i, coluna in enumerate(colunas):
+        if coluna not in anteriores:
+            continue
+        condicoes.append(f"{coluna} > :wm{i}")
+        parametros[f"wm{i}"] = anteriores[coluna]
+    if not condicoes:
+        return None, None
+    return " OR ".join(condicoes), parametros
+
+
+class TarefaExtracao:
+    """
+    Um arquivo da landing: tabela de origem, arquivo de destino e, na extração
+    incremental, o filtro de watermark e os maiores valores vistos nos chunks
+    """
+
+    def __init__(self, tabela, full_table_name, nome_arquivo, filtro=None, parametros=None, colunas_watermark=(),
+                 delta=False):
+        self.tabela = tabela
+        self.full_table_name = full_table_name
+        self.nome_arquivo = nome_arquivo
+        self.filtro = filtro
+        self.parametros = parametros
+        self.colunas_watermark = list(colunas_watermark)
+        # Delta da extração incremental: sem linhas novas, nenhum arquivo é gravado
+        self.delta = delta
+        self.vazia = False
+        self.watermark = {}
+        # Conteúdo gravado (preenchido quando o arquivo é concluído), para o manifesto
+        self.sha256 = None
+        self.tamanho = None
+
+    def chunks(self, fonte, tamanho_chunk):
+        """
+        Chunks da fonte, atualizando os watermarks a cada chunk lido
+        """
+        for df in fonte.extrair(self.full_table_name, tamanho_chunk, self.filtro, self.parametros):
+            for coluna in self.colunas_watermark:
+                valores = df[coluna].dropna()
+                if len(valores):
+                    maximo = _valor_json(valores.max())
+                    atual = self.watermark.get(coluna)
+                    self.watermark[coluna] = maximo if atual is None or maximo > atual else atual
+            yield df
+
+    def chunks_com_linhas(self, fonte, tamanho_chunk):
+        """
+        Como chunks(), mas no delta lê até o primeiro chunk com linhas antes de
+        devolver; sem nenhuma linha nova marca a tarefa como vazia e devolve None
+        """
+        chunks = self.chunks(fonte, tamanho_chunk)
+        if not self.delta:
+            return chunks
+        for df in chunks:
+            if len(df):
+                return itertools.chain([df], chunks)
+        self.vazia = True
+        return None
+
+    def particionar(self, coluna, minimo, maximo, n_particoes):
+        """
+        Divide a tarefa em até n_particoes faixas [inicio, fim) da chave, cada uma
+        gravada em um arquivo parte em {tabela}/
+        """
+        passo = -(-(maximo - minimo + 1) // n_particoes)
+        base, extensao = posixpath.splitext(self.nome_arquivo)
+        if "/" not in base:
+            base = f"{self.tabela}/{base}"
+        return [
+            TarefaExtracao(
+                self.tabela, self.full_table_name, f"{base}_part{i:03d}{extensao}",
+                f"{coluna} >= :inicio AND {coluna} < :fim",
+                {"inicio": inicio, "fim": min(inicio + passo, maximo + 1)},
+                self.colunas_watermark,
+            )
+            for i, inicio in enumerate(range(minimo, maximo + 1, passo))
+        ]
+
+
+def particionar_tarefas(fonte, tarefas, n_particoes=PARTICOES_EXTRACAO, min_chaves=MIN_CHAVES_PARTICAO):
+    """
+    Troca as tarefas de tabelas grandes (chave primária inteira de uma coluna, faixa
+    MIN..MAX com pelo menos min_chaves valores) por tarefas de faixas da chave.
+    Tarefas com filtro (deltas da extração incremental) não são particionadas.
+    """
+    if n_particoes < 2:
+        return tarefas
+    resultado = []
+    for tarefa in tarefas:
+        chave = fonte.chave_primaria(tarefa.full_table_name) if tarefa.filtro is None else []
+        if len(chave) == 1:
+            tipos = {nome: tipo for nome, tipo, *_ in fonte.colunas(tarefa.full_table_name)}
+            minimo, maximo = fonte.intervalo(tarefa.full_table_name, chave[0])
+            if (tipos[chave[0]].lower() in TIPOS_INTEIROS and minimo is not None
+                    and maximo - minimo + 1 >= min_chaves):
+                partes = tarefa.particionar(chave[0], int(minimo), int(maximo), n_particoes)
+                print(f"✂️ {tarefa.full_table_name}: {len(partes)} faixas de {chave[0]} ({minimo}..{maximo})")
+                resultado.extend(partes)
+                continue
+        resultado.append(tarefa)
+    return resultado
+
+
+def planejar_tarefas(tabelas, schema=None, formato="csv", incremental=False, watermarks=None, carimbo=None):
+    """
+    Uma tarefa por tabela. Com incremental, as tabelas de COLUNAS_WATERMARK leem
+    só o delta e gravam em um arquivo com data e hora: {tabela}/{tabela}_{carimbo}.{formato}
+    (só se houver linhas novas).
+    As outras sobrescrevem {tabela}.{formato} com a tabela completa.
+    """
+    carimbo = carimbo or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    tarefas = []
+    for table_name in tabelas:
+        full_table_name = f"{schema}.{table_name}" if schema else table_name
+        colunas = COLUNAS_WATERMARK.get(table_name, []) if incremental else []
+        if colunas:
+            filtro, parametros = filtro_watermark(colunas, (watermarks or {}).get(table_name, {}))
+            nome_arquivo = f"{table_name}/{table_name}_{carimbo}.{formato}"
+        else:
+            filtro, parametros = None, None
+            nome_arquivo = f"{table_name}.{formato}"
+        tarefas.append(TarefaExtracao(table_name, full_table_name, nome_arquivo, filtro, parametros, colunas,
+                                      delta=filtro is not None))
+    return tarefas
+
+
+def atualizar_watermarks(watermarks, tarefas):
+    """
+    Avança o watermark das tarefas concluídas. Nunca recua (ex.: um estado
+    gravado à mão ou por uma versão anterior com valores maiores).
+    """
+    for tarefa in tarefas:
+        if not tarefa.colunas_watermark:
+            continue
+        anteriores = watermarks.setdefault(tarefa.tabela, {})
+        for coluna, valor in tarefa.watermark.items():
+            if coluna not in anteriores or valor > anteriores[coluna]:
+                anteriores[coluna] = valor
+    return watermarks
+
+
+def arquivos_substituidos(nomes, tarefas):
+    """
+    Arquivos da landing que a extração completa das tarefas torna obsoletos:
+    {tabela}.{formato} e tudo em {tabela}/ (partes de outro número de faixas,
+    deltas incrementais) que não foi gravado agora
+    """
+    novos = {t.nome_arquivo for t in tarefas}
+    tabelas = {t.tabela for t in tarefas}
+    obsoletos = []
+    for nome in nomes:
+        if nome in novos:
+            continue
+        if "/" in nome:
+            da_tabela = nome.split("/", 1)[0] in tabelas
+        else:
+            base, extensao = posixpath.splitext(nome)
+            da_tabela = base in tabelas and extensao[1:] in FORMATOS
+        if da_tabela:
+            obsoletos.append(nome)
+    return obsoletos
+
+
+def enviar_em_chunks(directory_client, nome_arquivo, chunks, codificador):
+    """
+    Codifica cada chunk (CSV ou Parquet) e anexa ao arquivo no ADLS (append_data),
+    confirmando tudo no final com um único flush_data. Os chunks vão para
+    {arquivo}.enviando: o create_file do ADLS esvazia o arquivo na hora, e com
+    o nome final uma falha no meio deixaria a versão anterior vazia ou truncada.
+    Retorna (linhas, bytes, SHA-256 do conteúdo) enviados.
+    """
+    temporario = nome_arquivo + SUFIXO_TEMPORARIO
+    file_client = directory_client.get_file_client(temporario)
+    file_client.create_file()
+
+    sha = hashlib.sha256()
+    offset = 0
+    linhas = 0
+    for df in chunks:
+        data = codificador.codificar(df)
+        if data:
+            file_client.append_data(data, offset=offset, length=len(data))
+            sha.update(data)
+            offset += len(data)
+        linhas += len(df)
+
+    data = codificador.finalizar()
+    if data:
+        file_client.append_data(data, offset=offset, length=len(data))
+        sha.update(data)
+        offset += len(data)
+
+    file_client.flush_data(offset)
+    directory_client.renomear(temporario, nome_arquivo)
+    return linhas, offset, sha.hexdigest()
+
+
+class ProgressoTabela:
+    """
+    Progresso e métricas de um arquivo no pipeline. Os chunks são anexados a
+    {arquivo}.enviando, que só recebe o flush_data (e o nome final) quando a
+    extração terminou e todos os bytes já foram anexados.
+    """
+
+    def __init__(self, arquivo, directory_client):
+        self.arquivo = arquivo
+        self.directory_client = directory_client
+        self.temporario = arquivo + SUFIXO_TEMPORARIO
+        self.file_client = directory_client.get_file_client(self.temporario)
+        self._trava = threading.Lock()
+        self.linhas_extraidas = 0
+        self.linhas_enviadas = 0
+        self.bytes_enviados = 0
+        self.total_bytes = None
+        self.tempo_extracao = 0.0
+        self.tempo_upload = 0.0
+        self.espera_fila = 0.0
+        self.inicio = time.perf_counter()
+        self.fim = None
+        self.erro = None
+
+    def extraido(self, linhas, segundos, espera):
+        with self._trava:
+            self.linhas_extraidas += linhas
+            self.tempo_extracao += segundos
+            self.espera_fila += espera
+
+    def enviado(self, linhas, n_bytes, segundos):
+        with self._trava:
+            self.linhas_enviadas += linhas
+            self.bytes_enviados += n_bytes
+            self.tempo_upload += segundos
+            finalizar = self._pronta()
+        print(f"   ⬆️ {self.arquivo}: {self.linhas_enviadas} linhas ({self.bytes_enviados / 1e6:.1f} MB) enviadas")
+        if finalizar:
+            self._finalizar()
+
+    def extracao_concluida(self, total_bytes):
+        with self._trava:
+            self.total_bytes = total_bytes
+            finalizar = self._pronta()
+        if finalizar:
+            self._finalizar()
+
+    def falhou(self, erro):
+        with self._trava:
+            if self.erro is None:
+                self.erro = erro
+
+    def _pronta(self):
+        return (self.erro is None and self.fim is None and self.total_bytes is not None
+                and self.bytes_enviados == self.total_bytes)
+
+    def _finalizar(self):
+        try:
+            self.file_client.flush_data(self.total_bytes)
+            self.directory_client.renomear(self.temporario, self.arquivo)
+        except Exception as e:
+            self.falhou(e)
+            return
+        self.fim = time.perf_counter()
+        segundos = self.fim - self.inicio
+        print(f"✅ Arquivo '{self.arquivo}' concluído: {self.linhas_enviadas} linhas, "
+              f"{self.total_bytes / 1e6:.1f} MB em {segundos:.2f}s ({self.total_bytes / 1e6 / max(segundos, 1e-9):.1f} MB/s)")
+
+
+def pipeline_extracao(fonte, directory_client, tarefas, tamanho_chunk=TAMANHO_CHUNK,
+                      workers_extracao=WORKERS_EXTRACAO, workers_upload=WORKERS_UPLOAD, max_fila=MAX_FILA,
+                      formato="csv", compressao=COMPRESSAO_PARQUET, linhas_por_grupo=LINHAS_POR_ROW_GROUP):
+    """
+    Extração e upload em paralelo: um pool de extração lê as tarefas (arquivos)
+    em chunks e coloca cada chunk já codificado em uma fila limitada; um pool de
+    upload consome a fila e anexa os chunks no ADLS na posição (offset) de cada um.
+    Com a fila cheia a extração espera (backpressure): no máximo max_fila chunks
+    ficam em memória. Retorna {arquivo: ProgressoTabela}.
+    """
+    fila = queue.Queue(maxsize=max_fila)
+    progresso = {}
+
+    def extrair(tarefa):
+        p = progresso[tarefa.nome_arquivo] = ProgressoTabela(tarefa.nome_arquivo, directory_client)
+        print(f"🔍 Extraindo tabela: {tarefa.full_table_name} -> {tarefa.nome_arquivo} "
+              f"(chunks de {tamanho_chunk} linhas{', filtro: ' + tarefa.filtro if tarefa.filtro else ''})")
+        sha = hashlib.sha256()
+        offset = 0
+        try:
+            codificador = criar_codificador(fonte, tarefa.full_table_name, formato, compressao, linhas_por_grupo)
+            chunks = tarefa.chunks_com_linhas(fonte, tamanho_chunk)
+            if chunks is None:
+                print(f"💤 {tarefa.nome_arquivo}: sem linhas novas, arquivo não gravado")
+                p.total_bytes, p.fim = 0, time.perf_counter()
+                return
+            p.file_client.create_file()
+            while p.erro is None:
+                comeco = time.perf_counter()
+                df = next(chunks, None)
+                # Depois do último chunk ainda sai o restante do arquivo (no Parquet, o rodapé)
+                data = codificador.finalizar() if df is None else codificador.codificar(df)
+                linhas = 0 if df is None else len(df)
+                lido = time.perf_counter()
+                if data:
+                    # O hash segue a ordem do arquivo: é calculado aqui, antes dos uploads fora de ordem
+                    sha.update(data)
+                    fila.put((p, offset, data, linhas))
+                    offset += len(data)
+                p.extraido(linhas, lido - comeco, time.perf_counter() - lido)
+                if df is None:
+                    tarefa.sha256, tarefa.tamanho = sha.hexdigest(), offset
+                    break
+        except Exception as e:
+            p.falhou(e)
+        p.extracao_concluida(offset)
+
+    def enviar():
+        while True:
+            item = fila.get()
+            if item is None:
+                break
+            p, offset, data, linhas = item
+            if p.erro is None:
+                comeco = time.perf_counter()
+                try:
+                    p.file_client.append_data(data, offset=offset, length=len(data))
+                    p.enviado(linhas, len(data), time.perf_counter() - comeco)
+                except Exception as e:
+                    p.falhou(e)
+
+    inicio = time.perf_counter()
+    uploads = [threading.Thread(target=enviar, daemon=True) for _ in range(workers_upload)]
+    for t in uploads:
+        t.start()
+    with ThreadPoolExecutor(max_workers=workers_extracao) as pool:
+        list(pool.map(extrair, tarefas))
+    for _ in uploads:
+        fila.put(None)
+    for t in uploads:
+        t.join()
+    total = time.perf_counter() - inicio
+
+    print("\n📈 Métricas por arquivo:")
+    print(f"   {'arquivo':<48} {'linhas':>9} {'MB':>8} {'extração (s)':>13} {'upload (s)':>11} "
+          f"{'espera fila (s)':>16} {'total (s)':>10} {'MB/s':>7}")
+    for tarefa in tarefas:
+        p = progresso[tarefa.nome_arquivo]
+        if tarefa.vazia:
+            print(f"   {tarefa.nome_arquivo:<48} sem linhas novas (arquivo não gravado)")
+            continue
+        if p.erro is not None or p.fim is None:
+            print(f"   ❌ {tarefa.nome_arquivo:<45} erro: {p.erro}")
+            continue
+        segundos = p.fim - p.inicio
+        print(f"   {tarefa.nome_arquivo:<48} {p.linhas_enviadas:>9} {p.total_bytes / 1e6:>8.1f} {p.tempo_extracao:>13.2f} "
+              f"{p.tempo_upload:>11.2f} {p.espera_fila:>16.2f} {segundos:>10.2f} "
+              f"{p.total_bytes / 1e6 / max(segundos, 1e-9):>7.1f}")
+    total_bytes = sum(p.total_bytes or 0 for p in progresso.values() if p.fim is not None)
+    print(f"⏱️ Pipeline concluído em {total:.2f}s ({total_bytes / 1e6 / max(total, 1e-9):.1f} MB/s no total)")
+    return progresso
+
+
+def elt_sql_sqlserver_to_adls(modo=None, sqlite_db=None, destino_local=None, formato=None, incremental=None):
     print("🔄 Iniciando processo ELT...")
 
     # Carregar variáveis de ambiente do arquivo .env
@@ -19,7 +699,6 @@ def elt_sql_sqlserver_to_adls():
     account_name = os.getenv("ADLS_ACCOUNT_NAME")
     file_system_name = os.getenv("ADLS_FILE_SYSTEM_NAME")
     directory_name = os.getenv("ADLS_DIRECTORY_NAME")
-    sas_token = os.getenv("ADLS_SAS_TOKEN")
 
     print(f"📦 ADLS Config -> account: {account_name}, filesystem: {file_system_name}, directory: {directory_name}")
 
@@ -29,82 +708,137 @@ def elt_sql_sqlserver_to_adls():
     schema = os.getenv("SQL_SCHEMA")
     username = os.getenv("SQL_USERNAME")
     password = os.getenv("SQL_PASSWORD")
+    tamanho_chunk = int(os.getenv("SQL_CHUNK_SIZE", TAMANHO_CHUNK))
+
+    # Configurações da extração
+    modo = modo or os.getenv("EXTRACAO_MODO", "pipeline")
+    workers_extracao = int(os.getenv("EXTRACAO_WORKERS", WORKERS_EXTRACAO))
+    workers_upload = int(os.getenv("UPLOAD_WORKERS", WORKERS_UPLOAD))
+    max_fila = int(os.getenv("EXTRACAO_MAX_FILA", MAX_FILA))
+    formato = formato or os.getenv("EXTRACAO_FORMATO", "csv")
+    compressao = os.getenv("PARQUET_COMPRESSAO", COMPRESSAO_PARQUET)
+    linhas_por_grupo = int(os.getenv("PARQUET_LINHAS_ROW_GROUP", LINHAS_POR_ROW_GROUP))
+    if incremental is None:
+        incremental = os.getenv("EXTRACAO_INCREMENTAL", "0").lower() in ("1", "true", "sim")
+    caminho_estado = os.getenv("EXTRACAO_ESTADO", ESTADO_WATERMARK)
+    n_particoes = int(os.getenv("EXTRACAO_PARTICOES", PARTICOES_EXTRACAO))
+    min_chaves = int(os.getenv("EXTRACAO_MIN_PARTICAO", MIN_CHAVES_PARTICAO))
 
-    print(f"🗄️ SQL Server Config -> server: {server}, database: {database}, schema: {schema}, user: {username}")
+    try:
+        if sqlite_db:
+            fonte = FonteSQLite(sqlite_db)
+            schema = None
+            print(f"🗄️ Fonte local SQLite: {sqlite_db}")
+        else:
+            print(f"🗄️ SQL Server Config -> server: {server}, database: {database}, schema: {schema}, user: {username}")
 
-    # Proteger senha na URL
-    password = quote_plus(password)
+            # Proteger senha na URL
+            password = quote_plus(password)
 
-    # Conectar ao SQL Server
-    conn_str = f"mssql+pyodbc://{username}:{password}@{server}/{database}?driver=ODBC+Driver+17+for+SQL+Server"
-    print("🔌 String de conexão criada com sucesso.")
+            # Conectar ao SQL Server
+            conn_str = f"mssql+pyodbc://{username}:{password}@{server}/{database}?driver=ODBC+Driver+17+for+SQL+Server"
+            print("🔌 String de conexão criada com sucesso.")
 
-    try:
-        # Criar a engine do SQLAlchemy
-        engine = create_engine(conn_str)
-        print("✅ Conexão com SQL Server estabelecida.")
+            # Criar a engine do SQLAlchemy (com pool, usada em todas as consultas): cada
+            # faixa em extração segura uma conexão em streaming até o fim da leitura
+            fonte = FonteSQLAlchemy(conn_str, max(TAMANHO_POOL, workers_extracao + 1))
+            print("✅ Conexão com SQL Server estabelecida.")
     except Exception as e:
         print("❌ Erro ao conectar no SQL Server:", e)
         return
 
     # Consulta SQL para obter todas as tabelas do esquema
-    query = f"SELECT table_name FROM INFORMATION_SCHEMA.TABLES WHERE table_schema = '{schema}'"
-    print("📄 Executando consulta de tabelas:", query)
-
     try:
-        tables_df = pd.read_sql(query, engine)
-        print("📥 Tabelas encontradas:\n", tables_df)
+        tabelas = fonte.listar_tabelas(schema)
+        print("📥 Tabelas encontradas:", ", ".join(tabelas))
     except Exception as e:
         print("❌ Erro ao buscar as tabelas:", e)
         return
 
-    # Criar cliente do Azure Data Lake Storage
+    # Armazenamento da landing: ADLS ou, com destino_local, um diretório do disco
     try:
-        file_system_client = DataLakeServiceClient(
-            account_url=f"https://{account_name}.dfs.core.windows.net",
-            credential=sas_token,
-            api_version="2020-02-10"
-        )
-        print("✅ Conexão com Azure Data Lake estabelecida.")
+        directory_client = abrir_armazenamento(destino_local, directory_name)
+        manifesto = Manifesto(directory_client)
+        print(f"📁 Destino: {directory_client.descricao}")
     except Exception as e:
-        print("❌ Erro ao conectar no ADLS:", e)
+        print("❌ Erro ao abrir o armazenamento:", e)
         return
 
-    # Criar diretório, se necessário
-    try:
-        directory_client = file_system_client.get_file_system_client(file_system_name).get_directory_client(directory_name)
-        directory_client.create_directory()
-        print(f"📁 Diretório '{directory_name}' criado com sucesso.")
-    except ResourceExistsError:
-        print(f"ℹ️ Diretório '{directory_name}' já existe.")
-    except Exception as e:
-        print("❌ Erro ao criar diretório no ADLS:", e)
-        return
+    watermarks = carregar_watermarks(caminho_estado) if incremental else {}
+    tarefas = planejar_tarefas(tabelas, schema, formato, incremental, watermarks)
+    if incremental:
+        print(f"📌 Extração incremental (estado em {caminho_estado}):")
+        for tarefa in tarefas:
+            if tarefa.colunas_watermark:
+                print(f"   {tarefa.tabela}: {tarefa.filtro or 'primeira execução, extração completa'}")
+    tarefas = particionar_tarefas(fonte, tarefas, n_particoes, min_chaves)
 
-    # Loop nas tabelas
-    for index, row in tables_df.iterrows():
-        table_name = row["table_name"]
-        full_table_name = f"{schema}.{table_name}"
-        print(f"\n🔍 Processando tabela: {full_table_name}")
+    concluidas = []
+    if modo == "pipeline":
+        print(f"\n🚀 Modo pipeline: {workers_extracao} workers de extração, {workers_upload} de upload, "
+              f"fila de até {max_fila} chunks, formato {formato}")
+        progresso = pipeline_extracao(fonte, directory_client, tarefas, tamanho_chunk,
+                                      workers_extracao, workers_upload, max_fila,
+                                      formato, compressao, linhas_por_grupo)
+        concluidas = [t for t in tarefas if progresso[t.nome_arquivo].fim is not None]
+    else:
+        # Modo serial: cada chunk lido já é codificado e anexado ao arquivo no ADLS
+        for tarefa in tarefas:
+            print(f"\n🔍 Processando tabela: {tarefa.full_table_name} -> {tarefa.nome_arquivo} "
+                  f"(chunks de {tamanho_chunk} linhas)")
 
-        try:
-            query = f"SELECT * FROM {full_table_name}"
-            print(f"📄 Executando query: {query}")
-            df = pd.read_sql(query, conn_str)
-            print(f"📊 Linhas extraídas da tabela '{table_name}': {len(df)}")
-        except Exception as e:
-            print(f"❌ Erro ao extrair dados da tabela '{full_table_name}':", e)
-            continue
+            try:
+                codificador = criar_codificador(fonte, tarefa.full_table_name, formato, compressao, linhas_por_grupo)
+                chunks = tarefa.chunks_com_linhas(fonte, tamanho_chunk)
+                if chunks is None:
+                    print(f"💤 Tabela '{tarefa.tabela}' sem linhas novas: arquivo não gravado.")
+                    concluidas.append(tarefa)
+                    continue
+                linhas, tamanho, sha256 = enviar_em_chunks(directory_client, tarefa.nome_arquivo, chunks, codificador)
+                tarefa.sha256, tarefa.tamanho = sha256, tamanho
+                print(f"📊 Linhas extraídas da tabela '{tarefa.tabela}': {linhas}")
+                print(f"✅ Dados da tabela '{tarefa.tabela}' enviados ao ADLS com sucesso ({tamanho / 1e6:.1f} MB).")
+                concluidas.append(tarefa)
+            except Exception as e:
+                print(f"❌ Erro ao extrair/enviar a tabela '{tarefa.full_table_name}':", e)
 
-        # Salvar no ADLS
-        try:
-            file_client = directory_client.get_file_client(f"{table_name}.csv")
-            data = df.to_csv(index=False).encode()
-            file_client.upload_data(data, overwrite=True)
-            print(f"✅ Dados da tabela '{table_name}' enviados ao ADLS com sucesso.")
-        except Exception as e:
-            print(f"❌ Erro ao enviar '{table_name}.csv' para o ADLS:", e)
+    fonte.fechar()
+
+    # Manifesto da landing: quem processa os arquivos depois pula os que não mudaram
+    gravadas = [t for t in concluidas if not t.vazia]
+    alterados = [t for t in gravadas if manifesto.registrar(t.nome_arquivo, t.sha256, t.tamanho)]
+
+    # Tabelas extraídas por completo (sem falhas): os arquivos antigos delas saem da landing
+    # só agora, com os novos já gravados, para a Bronze não ler linhas repetidas
+    com_falha = {t.tabela for t in tarefas if t not in concluidas}
+    completas = [t for t in concluidas if not t.delta and t.tabela not in com_falha]
+    try:
+        obsoletos = arquivos_substituidos(directory_client.listar(), completas)
+        for nome in obsoletos:
+            directory_client.remover(nome)
+            manifesto.remover(nome)
+        if obsoletos:
+            print(f"🧹 {len(obsoletos)} arquivo(s) substituídos removidos da landing: {', '.join(obsoletos)}")
+    except Exception as e:
+        print("❌ Erro ao remover arquivos substituídos da landing:", e)
+    manifesto.salvar()
+    print(f"🧾 Manifesto: {len(alterados)} arquivo(s) com conteúdo novo, "
+          f"{len(gravadas) - len(alterados)} sem mudanças desde a última execução")
+
+    # O watermark só avança para as tabelas com todos os arquivos gravados por completo no destino
+    if incremental:
+        concluidas = [t for t in concluidas if t.tabela not in com_falha]
+        salvar_watermarks(atualizar_watermarks(watermarks, concluidas), caminho_estado)
+        print(f"📌 Watermarks atualizados em {caminho_estado}")
 
 # Executar a função
 if __name__ == "__main__":
-    elt_sql_sqlserver_to_adls()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Extração das tabelas do SQL Server para o ADLS")
+    parser.add_argument("--modo", choices=["serial", "pipeline"], help="padrão: EXTRACAO_MODO ou pipeline")
+    parser.add_argument("--sqlite-db", help="lê de um arquivo SQLite local em vez do SQL Server")
+    parser.add_argument("--destino-local", help="grava em um diretório local em vez do ADLS")
+    parser.add_argument("--formato", choices=FORMATOS, help="padrão: EXTRACAO_FORMATO ou csv")
+    parser.add_argument("--incremental", action="store_true", default=None,
+                        help="extrai só as linhas novas desde o último watermark (padrão: EXTRACAO_INCREMENTAL)")
+    args = parser.parse_args()
+    elt_sql_sqlserver_to_adls(args.modo, args.sqlite_db, args.destino_local, args.formato, args.incremental)
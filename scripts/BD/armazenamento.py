@@ -0,0 +1,391 @@
+"""
+Camada de armazenamento da landing zone.
+
+Dois drivers com a mesma interface: ArmazenamentoADLS (Azure Data Lake, via
+DataLakeDirectoryClient) e ArmazenamentoLocal (um diretório do disco, para
+rodar o pipeline e os benchmarks sem credenciais do ADLS). Os dois expõem
+get_file_client() para a escrita em streaming do extrator (create_file,
+append_data e flush_data), enviar_arquivo() para o upload de arquivos locais
+e listar(), remover() e renomear() para os arquivos já gravados.
+
+O Manifesto fica no próprio armazenamento (_manifesto.json) com o SHA-256 e o
+tamanho de cada arquivo: uploads com o mesmo conteúdo já registrado são
+pulados, e quem processa a landing sabe o que mudou desde a última execução.
+
+O UploaderEmBlocos envia arquivos grandes em blocos de tamanho fixo, vários
+em paralelo, confirmando (flush_data) o trecho contínuo já enviado de tempos
+em tempos; o offset confirmado fica em um arquivo de estado local, e um
+upload interrompido recomeça dali. O envio é feito em um nome temporário
+({arquivo}.enviando), renomeado para o nome final só depois do último flush.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+TAMANHO_BLOCO_HASH = 8 * 1024 * 1024
+# Upload em blocos: tamanho de cada append, appends simultâneos por arquivo e
+# de quantos em quantos bytes o trecho já enviado é confirmado
+TAMANHO_BLOCO_UPLOAD = 8 * 1024 * 1024
+BLOCOS_PARALELOS = 4
+BYTES_POR_CONFIRMACAO = 64 * 1024 * 1024
+ESTADO_UPLOADS = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".estado", "uploads.json")
+# Sufixo dos arquivos ainda em envio; renomeados para o nome final no último flush
+SUFIXO_TEMPORARIO = ".enviando"
+
+
+class ArquivoLocal:
+    """
+    Stand-in do DataLakeFileClient: como no ADLS, o create_file esvazia o
+    arquivo na hora e os dados anexados só aparecem nele depois do
+    flush_data (quem grava em um arquivo já publicado usa um nome
+    temporário e renomeia no final). Simplificação: um flush
+    com retain_uncommitted_data (confirmação parcial) não publica nada, o
+    arquivo final só aparece no último flush. No ADLS o flush parcial publica
+    o trecho confirmado no nome do arquivo (por isso o UploaderEmBlocos envia
+    para um nome temporário).
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._parcial = caminho + ".parcial"
+
+    def create_file(self):
+        # Como no ADLS, caminhos com subpastas ({tabela}/arquivo) criam as pastas
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        open(self.caminho, "wb").close()
+        open(self._parcial, "wb").close()
+
+    def append_data(self, data, offset, length=None):
+        # pwrite na posição: appends de threads diferentes não se atrapalham
+        fd = os.open(self._parcial, os.O_WRONLY)
+        try:
+            os.pwrite(fd, data[:length] if length is not None else data, offset)
+        finally:
+            os.close(fd)
+
+    def flush_data(self, offset, retain_uncommitted_data=False):
+        if retain_uncommitted_data:
+            return
+        os.truncate(self._parcial, offset)
+        os.replace(self._parcial, self.caminho)
+
+    def upload_data(self, data, overwrite=False):
+        if not overwrite and os.path.exists(self.caminho):
+            raise FileExistsError(self.caminho)
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        with open(self.caminho, "wb") as f:
+            f.write(data)
+
+
+class ArmazenamentoLocal:
+    """
+    Driver local: a landing zone é um diretório do disco
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.descricao = f"diretório local {caminho}"
+
+    def criar(self):
+        os.makedirs(self.caminho, exist_ok=True)
+
+    def get_file_client(self, nome_arquivo):
+        return ArquivoLocal(os.path.join(self.caminho, nome_arquivo))
+
+    def ler(self, nome_arquivo):
+        """
+        Conteúdo do arquivo, ou None se ele não existir
+        """
+        caminho = os.path.join(self.caminho, nome_arquivo)
+        if not os.path.exists(caminho):
+            return None
+        with open(caminho, "rb") as f:
+            return f.read()
+
+    def gravar(self, nome_arquivo, data):
+        self.get_file_client(nome_arquivo).upload_data(data, overwrite=True)
+
+    def enviar_arquivo(self, caminho_local, nome_arquivo):
+        destino = os.path.join(self.caminho, nome_arquivo)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        shutil.copyfile(caminho_local, destino)
+
+    def renomear(self, origem, destino):
+        caminho = os.path.join(self.caminho, destino)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        os.replace(os.path.join(self.caminho, origem), caminho)
+
+    def listar(self):
+        """
+        Nomes (com subpastas, separadas por /) de todos os arquivos
+        """
+        nomes = []
+        for raiz, _, arquivos in os.walk(self.caminho):
+            relativa = os.path.relpath(raiz, self.caminho)
+            for arquivo in arquivos:
+                nomes.append(arquivo if relativa == "." else f"{relativa.replace(os.sep, '/')}/{arquivo}")
+        return sorted(nomes)
+
+    def remover(self, nome_arquivo):
+        os.remove(os.path.join(self.caminho, nome_arquivo))
+
+
+class ArmazenamentoADLS:
+    """
+    Driver do Azure Data Lake: um diretório de um file system do ADLS Gen2
+    """
+
+    def __init__(self, account_name, file_system_name, diretorio, credencial, api_version="2020-02-10"):
+        from azure.storage.filedatalake import DataLakeServiceClient
+
+        service_client = DataLakeServiceClient(
+            account_url=f"https://{account_name}.dfs.core.windows.net",
+            credential=credencial,
+            api_version=api_version
+        )
+        self.file_system_client = service_client.get_file_system_client(file_system_name)
+        self.directory_client = self.file_system_client.get_directory_client(diretorio)
+        self.diretorio = diretorio.strip("/")
+        self.descricao = f"ADLS {account_name}/{file_system_name}/{diretorio}"
+
+    def criar(self):
+        from azure.core.exceptions import ResourceExistsError
+
+        try:
+            self.directory_client.create_directory()
+        except ResourceExistsError:
+            pass
+
+    def get_file_client(self, nome_arquivo):
+        return self.directory_client.get_file_client(nome_arquivo)
+
+    def ler(self, nome_arquivo):
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            return self.get_file_client(nome_arquivo).download_file().readall()
+        except ResourceNotFoundError:
+            return None
+
+    def gravar(self, nome_arquivo, data):
+        self.get_file_client(nome_arquivo).upload_data(data, overwrite=True)
+
+    def enviar_arquivo(self, caminho_local, nome_arquivo):
+        # O SDK lê o arquivo aberto aos poucos, sem carregá-lo inteiro na memória
+        with open(caminho_local, "rb") as f:
+            self.get_file_client(nome_arquivo).upload_data(f, overwrite=True, length=os.path.getsize(caminho_local))
+
+    def renomear(self, origem, destino):
+        # O novo nome do rename_file inclui o file system; um arquivo no destino é substituído
+        caminho = f"{self.diretorio}/{destino}" if self.diretorio else destino
+        self.get_file_client(origem).rename_file(f"{self.file_system_client.file_system_name}/{caminho}")
+
+    def listar(self):
+        prefixo = f"{self.diretorio}/" if self.diretorio else ""
+        return sorted(
+            caminho.name[len(prefixo):]
+            for caminho in self.file_system_client.get_paths(path=self.diretorio or None, recursive=True)
+            if not caminho.is_directory
+        )
+
+    def remover(self, nome_arquivo):
+        self.get_file_client(nome_arquivo).delete_file()
+
+
+def abrir_armazenamento(destino_local=None, diretorio=None):
+    """
+    Driver local se destino_local for informado; senão o ADLS configurado nas
+    variáveis ADLS_ACCOUNT_NAME, ADLS_FILE_SYSTEM_NAME, ADLS_SAS_TOKEN e
+    ADLS_DIRECTORY_NAME (ou o diretorio informado)
+    """
+    if destino_local:
+        armazenamento = ArmazenamentoLocal(destino_local)
+    else:
+        armazenamento = ArmazenamentoADLS(
+            os.getenv("ADLS_ACCOUNT_NAME"),
+            os.getenv("ADLS_FILE_SYSTEM_NAME"),
+            diretorio or os.getenv("ADLS_DIRECTORY_NAME"),
+            os.getenv("ADLS_SAS_TOKEN"),
+        )
+    armazenamento.criar()
+    return armazenamento
+
+
+def hash_arquivo(caminho, tamanho_bloco=TAMANHO_BLOCO_HASH):
+    """
+    (SHA-256, tamanho) de um arquivo local, lido em blocos
+    """
+    sha = hashlib.sha256()
+    tamanho = 0
+    with open(caminho, "rb") as f:
+        while bloco := f.read(tamanho_bloco):
+            sha.update(bloco)
+            tamanho += len(bloco)
+    return sha.hexdigest(), tamanho
+
+
+class Manifesto:
+    """
+    {arquivo: {sha256, tamanho, atualizado_em}} dos arquivos do armazenamento
+    """
+
+    NOME = "_manifesto.json"
+
+    def __init__(self, armazenamento):
+        self.armazenamento = armazenamento
+        conteudo = armazenamento.ler(self.NOME)
+        self.arquivos = json.loads(conteudo) if conteudo else {}
+        self._lock = threading.Lock()
+
+    def inalterado(self, nome_arquivo, sha256, tamanho):
+        registro = self.arquivos.get(nome_arquivo)
+        return registro is not None and registro["sha256"] == sha256 and registro["tamanho"] == tamanho
+
+    def registrar(self, nome_arquivo, sha256, tamanho):
+        """
+        Registra o conteúdo atual do arquivo; retorna se ele mudou
+        """
+        with self._lock:
+            alterado = not self.inalterado(nome_arquivo, sha256, tamanho)
+            if alterado:
+                self.arquivos[nome_arquivo] = {
+                    "sha256": sha256,
+                    "tamanho": tamanho,
+                    "atualizado_em": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                }
+            return alterado
+
+    def remover(self, nome_arquivo):
+        with self._lock:
+            self.arquivos.pop(nome_arquivo, None)
+
+    def salvar(self):
+        with self._lock:
+            data = json.dumps(self.arquivos, indent=2, sort_keys=True).encode()
+        self.armazenamento.gravar(self.NOME, data)
+
+
+def enviar_se_alterado(armazenamento, manifesto, caminho_local, nome_arquivo=None, uploader=None):
+    """
+    Envia o arquivo local só se o conteúdo for diferente do registrado no
+    manifesto (pelo uploader em blocos, se informado); retorna se houve upload
+    """
+    nome_arquivo = nome_arquivo or os.path.basename(caminho_local)
+    sha256, tamanho = hash_arquivo(caminho_local)
+    if manifesto.inalterado(nome_arquivo, sha256, tamanho):
+        return False
+    if uploader is not None:
+        uploader.enviar(caminho_local, nome_arquivo)
+    else:
+        armazenamento.enviar_arquivo(caminho_local, nome_arquivo)
+    manifesto.registrar(nome_arquivo, sha256, tamanho)
+    return True
+
+
+class UploaderEmBlocos:
+    """
+    Upload de arquivos locais em blocos de tamanho_bloco, com até
+    blocos_paralelos appends simultâneos por arquivo (memória limitada a
+    blocos_paralelos blocos). O trecho contínuo já enviado é confirmado com
+    flush_data a cada bytes_por_confirmacao e o offset confirmado é gravado
+    em caminho_estado: se o upload for interrompido, a próxima chamada para
+    o mesmo arquivo (mesmo tamanho e data de modificação) continua dali.
+    Os blocos vão para {arquivo}.enviando: no ADLS a confirmação parcial
+    publica o trecho enviado, e com o nome final a Bronze poderia ler um
+    arquivo truncado. O nome final só aparece com o arquivo completo.
+    """
+
+    SUFIXO_TEMPORARIO = SUFIXO_TEMPORARIO
+
+    def __init__(self, armazenamento, tamanho_bloco=TAMANHO_BLOCO_UPLOAD, blocos_paralelos=BLOCOS_PARALELOS,
+                 bytes_por_confirmacao=BYTES_POR_CONFIRMACAO, caminho_estado=ESTADO_UPLOADS):
+        self.armazenamento = armazenamento
+        self.tamanho_bloco = tamanho_bloco
+        self.blocos_paralelos = blocos_paralelos
+        self.bytes_por_confirmacao = bytes_por_confirmacao
+        self.caminho_estado = caminho_estado
+        self._lock = threading.Lock()
+
+    def _chave(self, nome_arquivo):
+        return f"{self.armazenamento.descricao}|{nome_arquivo}"
+
+    def _ler_estado(self):
+        if not os.path.exists(self.caminho_estado):
+            return {}
+        with open(self.caminho_estado, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _gravar_estado(self, nome_arquivo, registro):
+        # Grava em arquivo temporário e renomeia para não expor um estado pela metade
+        with self._lock:
+            estado = self._ler_estado()
+            if registro is None:
+                estado.pop(self._chave(nome_arquivo), None)
+            else:
+                estado[self._chave(nome_arquivo)] = registro
+            os.makedirs(os.path.dirname(self.caminho_estado) or ".", exist_ok=True)
+            temporario = self.caminho_estado + f".{os.getpid()}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(estado, f, indent=2, ensure_ascii=False)
+            os.replace(temporario, self.caminho_estado)
+
+    def enviar(self, caminho_local, nome_arquivo=None):
+        """
+        Envia (ou retoma) o upload do arquivo; retorna os bytes enviados nesta chamada
+        """
+        nome_arquivo = nome_arquivo or os.path.basename(caminho_local)
+        info = os.stat(caminho_local)
+        versao = {"tamanho": info.st_size, "mtime_ns": info.st_mtime_ns, "tamanho_bloco": self.tamanho_bloco}
+        anterior = self._ler_estado().get(self._chave(nome_arquivo))
+        temporario = nome_arquivo + self.SUFIXO_TEMPORARIO
+        file_client = self.armazenamento.get_file_client(temporario)
+
+        # Retoma só se o arquivo local e o tamanho do bloco forem os mesmos da tentativa anterior
+        if anterior and all(anterior[k] == v for k, v in versao.items()):
+            confirmado = anterior["confirmado"]
+            print(f"   ↩️ Retomando '{nome_arquivo}' a partir de {confirmado / 1e6:.1f} MB")
+        else:
+            confirmado = 0
+            file_client.create_file()
+        self._gravar_estado(nome_arquivo, {**versao, "confirmado": confirmado})
+
+        inicio_envio = confirmado
+        fd = os.open(caminho_local, os.O_RDONLY)
+        try:
+            def enviar_bloco(offset):
+                data = os.pread(fd, self.tamanho_bloco, offset)
+                file_client.append_data(data, offset=offset, length=len(data))
+                return offset, len(data)
+
+            offsets = iter(range(confirmado, info.st_size, self.tamanho_bloco))
+            concluidos = {}
+            contiguo = confirmado
+            with ThreadPoolExecutor(max_workers=self.blocos_paralelos) as pool:
+                pendentes = {pool.submit(enviar_bloco, o) for _, o in zip(range(self.blocos_paralelos), offsets)}
+                while pendentes:
+                    prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for futuro in prontos:
+                        # Um bloco com erro interrompe o upload; o estado guarda o último offset confirmado
+                        offset, tamanho = futuro.result()
+                        concluidos[offset] = tamanho
+                        proximo = next(offsets, None)
+                        if proximo is not None:
+                            pendentes.add(pool.submit(enviar_bloco, proximo))
+                    while contiguo in concluidos:
+                        contiguo += concluidos.pop(contiguo)
+                    if contiguo - confirmado >= self.bytes_por_confirmacao and contiguo < info.st_size:
+                        file_client.flush_data(contiguo, retain_uncommitted_data=True)
+                        confirmado = contiguo
+                        self._gravar_estado(nome_arquivo, {**versao, "confirmado": confirmado})
+        finally:
+            os.close(fd)
+
+        file_client.flush_data(info.st_size)
+        self.armazenamento.renomear(temporario, nome_arquivo)
+        self._gravar_estado(nome_arquivo, None)
+        return info.st_size - inicio_envio
@@ -0,0 +1,129 @@
+"""
+Distribuições configuráveis para as chaves estrangeiras e datas do gerador.
+
+Por padrão toda chave estrangeira é uniforme. Para reproduzir a
+assimetria de produção (poucos best-sellers e clientes frequentes
+concentrando item_pedido) cada relação pode receber:
+- Zipf(expoente): popularidade decrescente por posição (rank) da chave
+- ConjuntoQuente(pct_quente, peso): pct_quente das chaves recebe peso das linhas
+- Sazonalidade(pesos_mes, pesos_dia_semana): datas de pedido com picos
+
+As relações são identificadas por 'tabela.coluna', por exemplo
+{'item_pedido.cod_livro': Zipf(1.1), 'pedido.data_pedido': Sazonalidade()}.
+Todas sorteiam por posição e nunca materializam a lista de chaves dos pais.
+"""
+
+from math import gcd
+
+import numpy as np
+
+
+def _embaralhar(posicoes, n):
+    """
+    Permutação fixa das posições 0..n-1 (multiplicação por constante coprima com n),
+    para que as chaves mais populares não sejam sempre os menores ids
+    """
+    if n <= 1:
+        return posicoes
+    fator = 2654435761 % n
+    while gcd(fator, n) != 1:
+        fator += 1
+    return (posicoes * fator + n // 3) % n
+
+
+class Uniforme:
+    def sortear(self, rng, chaves, n):
+        return chaves.por_posicao(rng.integers(0, len(chaves), n))
+
+
+class Zipf:
+    """
+    Zipf limitado às N chaves: a chave de rank k tem peso proporcional a 1 / k^expoente
+    """
+
+    def __init__(self, expoente=1.1):
+        self.expoente = expoente
+
+    def sortear(self, rng, chaves, n):
+        total = len(chaves)
+        u = rng.random(n)
+        # Inversa da CDF contínua de 1/x^s em [1, N + 1)
+        if np.isclose(self.expoente, 1.0):
+            x = np.power(total + 1.0, u)
+        else:
+            a = 1.0 - self.expoente
+            x = np.power((np.power(total + 1.0, a) - 1.0) * u + 1.0, 1.0 / a)
+        ranks = np.minimum(x.astype(np.int64) - 1, total - 1)
+        return chaves.por_posicao(_embaralhar(ranks, total))
+
+
+class ConjuntoQuente:
+    """
+    pct_quente das chaves (conjunto quente) recebe a fração peso das linhas
+    """
+
+    def __init__(self, pct_quente=0.01, peso=0.8):
+        self.pct_quente = pct_quente
+        self.peso = peso
+
+    def sortear(self, rng, chaves, n):
+        total = len(chaves)
+        n_quente = min(total, max(1, int(round(total * self.pct_quente))))
+        if n_quente >= total:
+            return Uniforme().sortear(rng, chaves, n)
+
+        quente = rng.random(n) < self.peso
+        posicoes = np.where(
+            quente,
+            rng.integers(0, n_quente, n),
+            rng.integers(n_quente, total, n),
+        )
+        return chaves.por_posicao(_embaralhar(posicoes, total))
+
+
+# Picos em dezembro (Natal) e julho (férias); fins de semana vendem mais
+PESOS_MES = [0.8, 0.8, 0.9, 0.9, 1.0, 1.0, 1.3, 1.0, 0.9, 1.0, 1.2, 1.8]
+PESOS_DIA_SEMANA = [1.0, 1.0, 1.0, 1.0, 1.1, 1.3, 1.3]
+
+
+class Sazonalidade:
+    """
+    Datas com peso por mês do ano e por dia da semana (segunda = 0)
+    """
+
+    def __init__(self, pesos_mes=None, pesos_dia_semana=None):
+        self.pesos_mes = np.asarray(pesos_mes or PESOS_MES, dtype=float)
+        self.pesos_dia_semana = np.asarray(pesos_dia_semana or PESOS_DIA_SEMANA, dtype=float)
+
+    def sortear(self, rng, inicio, fim, n):
+        dias = np.arange(np.datetime64(inicio, 'D'), np.datetime64(fim, 'D') + 1)
+        mes = dias.astype('datetime64[M]').astype(np.int64) % 12
+        # 1970-01-01 foi uma quinta-feira
+        dia_semana = (dias.astype(np.int64) + 3) % 7
+        pesos = self.pesos_mes[mes] * self.pesos_dia_semana[dia_semana]
+        return dias[rng.choice(len(dias), n, p=pesos / pesos.sum())]
+
+
+UNIFORME = Uniforme()
+
+# Cenário com a assimetria observada em produção
+CENARIO_PRODUCAO = {
+    'item_pedido.cod_livro': Zipf(1.1),
+    'item_pedido.cod_pedido': ConjuntoQuente(pct_quente=0.10, peso=0.40),
+    'pedido.cod_cliente': ConjuntoQuente(pct_quente=0.05, peso=0.50),
+    'livro.cod_editora': Zipf(0.9),
+    'livro.cod_autor': Zipf(0.8),
+    'pedido.data_pedido': Sazonalidade(),
+}
+
+CENARIOS = {
+    'uniforme': {},
+    'producao': CENARIO_PRODUCAO,
+}
+
+
+def distribuicao(distribuicoes, relacao):
+    """
+    Distribuição configurada para a relação 'tabela.coluna' (uniforme se ausente)
+    """
+    return (distribuicoes or {}).get(relacao, UNIFORME)
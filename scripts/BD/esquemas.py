@@ -0,0 +1,109 @@
+"""
+Registro de esquemas das tabelas da landing, usado na leitura da Bronze.
+
+Os esquemas saem das DDLs que o projeto já declara, sem repetir tipos à mão:
+- "landing": DDL do gerador (gerador_dados.DDL), o modelo dos arquivos do
+  notebook Script_DB_to_CSV_to_Landing (cod_cliente, data_pedido, ...)
+- "sqlserver": DDLs de banco_eng_dados/Script.py, o modelo extraído do
+  SQL Server por Script_db_to_azure.py (id_cliente, data, ...)
+
+esquema_spark() devolve o StructType de uma tabela e esquema_ddl() o mesmo
+esquema como texto DDL do Spark ("cod_autor BIGINT, nome STRING, ...").
+Com um deles em spark.read.schema(...) o CSV é lido já tipado, em uma
+passada só, sem a varredura extra da inferência de tipos.
+"""
+
+import os
+import re
+import sys
+from functools import lru_cache
+
+DIRETORIO_BANCO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'banco_eng_dados')
+MODELOS = ['landing', 'sqlserver']
+
+# Tipo da DDL -> tipo do Spark. INTEGER é o inteiro de 64 bits do SQLite do
+# gerador; INT é o inteiro de 32 bits do SQL Server.
+TIPOS_SPARK = {
+    'INTEGER': 'BIGINT',
+    'INT': 'INT',
+    'TEXT': 'STRING',
+    'VARCHAR': 'STRING',
+    'REAL': 'DOUBLE',
+    'DECIMAL': 'DECIMAL',
+    'DATE': 'DATE',
+}
+
+# No SQLite do gerador as datas são TEXT, mas sempre no formato ISO (AAAA-MM-DD)
+DATAS_EM_TEXTO = {
+    'landing': {'data_pedido', 'data_pag'},
+    'sqlserver': set(),
+}
+
+
+@lru_cache(maxsize=None)
+def _ddls(modelo):
+    """
+    {tabela: corpo do CREATE TABLE} do modelo
+    """
+    if modelo == 'landing':
+        from gerador_dados import DDL
+
+        return dict(re.findall(r'CREATE TABLE (\w+) \((.*?)\n\);', DDL, re.S))
+    if modelo == 'sqlserver':
+        if DIRETORIO_BANCO not in sys.path:
+            sys.path.append(DIRETORIO_BANCO)
+        from Script import csv_tables
+
+        return dict(csv_tables)
+    raise ValueError(f"Modelo '{modelo}' desconhecido (use um de {MODELOS})")
+
+
+def tabelas(modelo='landing'):
+    return list(_ddls(modelo))
+
+
+@lru_cache(maxsize=None)
+def colunas(tabela, modelo='landing'):
+    """
+    [(coluna, tipo do Spark)] na ordem da DDL, ex.: ('valor_total', 'DECIMAL(10,2)')
+    """
+    ddl = _ddls(modelo).get(tabela)
+    if ddl is None:
+        raise KeyError(f"Tabela '{tabela}' não existe no modelo '{modelo}'")
+
+    resultado = []
+    for nome, tipo, precisao, escala in re.findall(r'^\s*(\w+)\s+([A-Z]+)(?:\((\d+)(?:,\s*(\d+))?\))?', ddl, re.M):
+        if tipo not in TIPOS_SPARK or nome.upper() in ('CREATE', 'FOREIGN', 'PRIMARY'):
+            continue
+        tipo_spark = TIPOS_SPARK[tipo]
+        if tipo_spark == 'DECIMAL':
+            tipo_spark = f'DECIMAL({precisao or 10},{escala or 0})'
+        elif nome in DATAS_EM_TEXTO[modelo]:
+            tipo_spark = 'DATE'
+        resultado.append((nome, tipo_spark))
+    return resultado
+
+
+def esquema_ddl(tabela, modelo='landing'):
+    """
+    Esquema como texto DDL do Spark (aceito por spark.read.schema)
+    """
+    return ', '.join(f'{nome} {tipo}' for nome, tipo in colunas(tabela, modelo))
+
+
+def esquema_spark(tabela, modelo='landing'):
+    """
+    StructType da tabela
+    """
+    from pyspark.sql.types import (
+        DateType, DecimalType, DoubleType, IntegerType, LongType, StringType, StructField, StructType,
+    )
+
+    simples = {'BIGINT': LongType(), 'INT': IntegerType(), 'STRING': StringType(),
+               'DOUBLE': DoubleType(), 'DATE': DateType()}
+    campos = []
+    for nome, tipo in colunas(tabela, modelo):
+        decimal = re.match(r'DECIMAL\((\d+),(\d+)\)', tipo)
+        tipo_spark = DecimalType(int(decimal.group(1)), int(decimal.group(2))) if decimal else simples[tipo]
+        campos.append(StructField(nome, tipo_spark, True))
+    return StructType(campos)
@@ -0,0 +1,729 @@
+"""
+Gerador de dados sintéticos da livraria (banco livraria.db).
+
+Cada tabela é montada coluna a coluna: ids, chaves estrangeiras, preços,
+quantidades e datas são sorteados com NumPy de uma vez só e as linhas são
+gravadas em lote com executemany, em vez de um cursor.execute por linha.
+Os textos (nomes, ruas, títulos, ...) vêm do pool de valores pt_BR
+(pool_valores.py), sorteados por índice, sem chamar o Faker por linha.
+
+Tabelas geradas (mesmo esquema do notebook Script_DB_to_CSV_to_Landing):
+- cliente, endereco, autor, editora, categoria, livro, estoque,
+  pedido, tipo_pagamento, item_pedido, pagamento
+
+gerar_dataset() gera em lotes de tamanho fixo e grava direto no destino
+escolhido (CSV, Parquet ou, opcionalmente, o próprio SQLite), sem banco
+intermediário e com memória limitada.
+
+As chaves estrangeiras são sorteadas de faixas de ids (FaixaIds), nunca
+de listas com todas as chaves dos pais, então tabelas filhas de qualquer
+tamanho são geradas com memória constante. Cada relação pode ter uma distribuição própria
+(uniforme, Zipf, conjunto quente, sazonalidade): ver distribuicoes.py.
+
+Para volumes maiores use gerar_csvs(scale_factor=...): as tabelas são
+divididas em faixas de ids (shards) geradas em paralelo por um pool de
+processos, cada shard com sua própria semente, e as partes são unidas
+nos mesmos arquivos {tabela}.csv. SF1 reproduz os volumes do notebook.
+"""
+
+import argparse
+import os
+import re
+import shutil
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from distribuicoes import CENARIOS, distribuicao
+from pool_valores import carregar_pool, emails_unicos, nomes, sortear
+
+DDL = """
+DROP TABLE IF EXISTS item_pedido;
+DROP TABLE IF EXISTS pagamento;
+DROP TABLE IF EXISTS tipo_pagamento;
+DROP TABLE IF EXISTS pedido;
+DROP TABLE IF EXISTS estoque;
+DROP TABLE IF EXISTS livro;
+DROP TABLE IF EXISTS categoria;
+DROP TABLE IF EXISTS editora;
+DROP TABLE IF EXISTS autor;
+DROP TABLE IF EXISTS endereco;
+DROP TABLE IF EXISTS cliente;
+
+CREATE TABLE cliente (
+    cod_cliente INTEGER PRIMARY KEY,
+    nome TEXT,
+    email TEXT,
+    telefone TEXT
+);
+
+CREATE TABLE endereco (
+    cod_endereco INTEGER PRIMARY KEY,
+    cod_cliente INTEGER,
+    rua TEXT,
+    numero TEXT,
+    cidade TEXT,
+    estado TEXT,
+    cep TEXT,
+    FOREIGN KEY (cod_cliente) REFERENCES cliente(cod_cliente)
+);
+
+CREATE TABLE autor (
+    cod_autor INTEGER PRIMARY KEY,
+    nome TEXT,
+    nacionalidade TEXT
+);
+
+CREATE TABLE editora (
+    cod_editora INTEGER PRIMARY KEY,
+    nome TEXT,
+    contato TEXT
+);
+
+CREATE TABLE categoria (
+    cod_categoria INTEGER PRIMARY KEY,
+    nome TEXT
+);
+
+CREATE TABLE livro (
+    cod_livro INTEGER PRIMARY KEY,
+    titulo TEXT,
+    cod_autor INTEGER,
+    cod_editora INTEGER,
+    cod_categoria INTEGER,
+    ano_publicacao INTEGER,
+    preco REAL,
+    FOREIGN KEY (cod_autor) REFERENCES autor(cod_autor),
+    FOREIGN KEY (cod_editora) REFERENCES editora(cod_editora),
+    FOREIGN KEY (cod_categoria) REFERENCES categoria(cod_categoria)
+);
+
+CREATE TABLE estoque (
+    cod_livro INTEGER PRIMARY KEY,
+    quantidade INTEGER,
+    FOREIGN KEY (cod_livro) REFERENCES livro(cod_livro)
+);
+
+CREATE TABLE pedido (
+    cod_pedido INTEGER PRIMARY KEY,
+    cod_cliente INTEGER,
+    data_pedido TEXT,
+    status TEXT,
+    FOREIGN KEY (cod_cliente) REFERENCES cliente(cod_cliente)
+);
+
+CREATE TABLE tipo_pagamento (
+    cod_tipo INTEGER PRIMARY KEY,
+    nome TEXT
+);
+
+CREATE TABLE pagamento (
+    cod_pagamento INTEGER PRIMARY KEY,
+    cod_pedido INTEGER,
+    cod_tipo INTEGER,
+    data_pag TEXT,
+    valor_pago REAL,
+    FOREIGN KEY (cod_pedido) REFERENCES pedido(cod_pedido),
+    FOREIGN KEY (cod_tipo) REFERENCES tipo_pagamento(cod_tipo)
+);
+
+CREATE TABLE item_pedido (
+    cod_item INTEGER PRIMARY KEY,
+    cod_pedido INTEGER,
+    cod_livro INTEGER,
+    quantidade INTEGER,
+    preco_unitario REAL,
+    FOREIGN KEY (cod_pedido) REFERENCES pedido(cod_pedido),
+    FOREIGN KEY (cod_livro) REFERENCES livro(cod_livro)
+);
+"""
+
+
+def _colunas_do_ddl(ddl):
+    """
+    Extrai {tabela: [colunas]} dos CREATE TABLE do DDL
+    """
+    colunas = {}
+    for tabela, corpo in re.findall(r'CREATE TABLE (\w+) \((.*?)\n\);', ddl, re.S):
+        colunas[tabela] = [
+            linha.split()[0] for linha in corpo.strip().splitlines()
+            if not linha.strip().startswith('FOREIGN KEY')
+        ]
+    return colunas
+
+
+COLUNAS = _colunas_do_ddl(DDL)
+
+# Volumes usados originalmente no notebook (scale factor 1)
+VOLUMES = {
+    'cliente': 25000,
+    'endereco': 25000,
+    'autor': 5000,
+    'editora': 1000,
+    'categoria': 100,
+    'livro': 30000,
+    'estoque': 10000,
+    'pedido': 30000,
+    'item_pedido': 50000,
+}
+
+TIPOS_PAGAMENTO = ['Cartão', 'Boleto', 'Pix']
+STATUS_PEDIDO = ['Pago', 'Pendente', 'Cancelado']
+TAMANHO_LOTE = 50000
+
+# Tabelas de domínio não crescem com o scale factor (como nation/region no TPC-H)
+TABELAS_FIXAS = ['categoria']
+
+# Ordem de exportação dos CSVs (mesma do notebook)
+TABELAS = [
+    'cliente', 'endereco', 'autor', 'editora', 'livro', 'pedido',
+    'item_pedido', 'estoque', 'pagamento', 'categoria', 'tipo_pagamento',
+]
+
+
+def criar_tabelas(conn):
+    """
+    Recria todas as tabelas do banco
+    """
+    conn.executescript(DDL)
+    conn.commit()
+
+
+def gravar_tabela(conn, tabela, df, tamanho_lote=TAMANHO_LOTE):
+    """
+    Grava um DataFrame em lote com executemany (um commit por lote)
+    """
+    cols = ', '.join(df.columns)
+    placeholders = ', '.join(['?'] * len(df.columns))
+    sql = f"INSERT INTO {tabela} ({cols}) VALUES ({placeholders})"
+
+    # Conversão para tipos Python feita uma vez por coluna, não por célula
+    colunas = [df[col].tolist() for col in df.columns]
+    linhas = list(zip(*colunas))
+
+    for i in range(0, len(linhas), tamanho_lote):
+        conn.executemany(sql, linhas[i:i + tamanho_lote])
+        conn.commit()
+
+
+def volumes_por_escala(scale_factor=1):
+    """
+    Volumes de cada tabela para o scale factor informado (SF1 = notebook)
+    """
+    return {
+        tabela: n if tabela in TABELAS_FIXAS else max(1, int(round(n * scale_factor)))
+        for tabela, n in VOLUMES.items()
+    }
+
+
+class FaixaIds:
+    """
+    Chaves contíguas [inicio, fim]: o sorteio usa só os limites, sem lista de ids
+    """
+
+    def __init__(self, inicio, fim):
+        self.inicio = int(inicio)
+        self.fim = int(fim)
+
+    def __len__(self):
+        return max(0, self.fim - self.inicio + 1)
+
+    def sortear(self, rng, n):
+        return rng.integers(self.inicio, self.fim + 1, n)
+
+    def por_posicao(self, posicoes):
+        return self.inicio + posicoes
+
+    def sortear_distintos(self, rng, n):
+        return self.inicio + rng.choice(len(self), n, replace=False)
+
+
+def _ids(n, inicio=1):
+    return np.arange(inicio, inicio + n, dtype=np.int64)
+
+
+def _datas_entre(rng, inicio, fim, n):
+    """
+    Sorteia n datas (datetime64[D]) uniformes no intervalo [inicio, fim]
+    """
+    inicio = np.asarray(inicio, dtype='datetime64[D]')
+    fim = np.asarray(fim, dtype='datetime64[D]')
+    dias = (fim - inicio).astype(np.int64) + 1
+    return inicio + (rng.random(n) * dias).astype(np.int64)
+
+
+def _precos(rng, n, minimo=25, maximo=180):
+    return np.round(rng.uniform(minimo, maximo, n), 2)
+
+
+def gerar_cliente(n, rng, pool, inicio=1):
+    ids = _ids(n, inicio)
+    return pd.DataFrame({
+        'cod_cliente': ids,
+        'nome': nomes(pool, rng, n),
+        'email': emails_unicos(pool, ids),
+        'telefone': sortear(pool, 'telefone', rng, n),
+    })
+
+
+def gerar_endereco(n, rng, pool, ids_cliente, inicio=1, distribuicoes=None):
+    return pd.DataFrame({
+        'cod_endereco': _ids(n, inicio),
+        'cod_cliente': distribuicao(distribuicoes, 'endereco.cod_cliente').sortear(rng, ids_cliente, n),
+        'rua': sortear(pool, 'rua', rng, n),
+        'numero': sortear(pool, 'numero', rng, n),
+        'cidade': sortear(pool, 'cidade', rng, n),
+        'estado': sortear(pool, 'estado', rng, n),
+        'cep': sortear(pool, 'cep', rng, n),
+    })
+
+
+def gerar_autor(n, rng, pool, inicio=1):
+    return pd.DataFrame({
+        'cod_autor': _ids(n, inicio),
+        'nome': nomes(pool, rng, n),
+        'nacionalidade': sortear(pool, 'pais', rng, n),
+    })
+
+
+def gerar_editora(n, rng, pool, inicio=1):
+    ids = _ids(n, inicio)
+    return pd.DataFrame({
+        'cod_editora': ids,
+        'nome': sortear(pool, 'empresa', rng, n),
+        'contato': emails_unicos(pool, ids),
+    })
+
+
+def gerar_categoria(n, rng, pool, inicio=1):
+    return pd.DataFrame({
+        'cod_categoria': _ids(n, inicio),
+        'nome': np.char.capitalize(sortear(pool, 'palavra', rng, n)),
+    })
+
+
+def gerar_livro(n, rng, pool, ids_autor, ids_editora, ids_categoria, inicio=1, distribuicoes=None):
+    return pd.DataFrame({
+        'cod_livro': _ids(n, inicio),
+        'titulo': sortear(pool, 'titulo', rng, n),
+        'cod_autor': distribuicao(distribuicoes, 'livro.cod_autor').sortear(rng, ids_autor, n),
+        'cod_editora': distribuicao(distribuicoes, 'livro.cod_editora').sortear(rng, ids_editora, n),
+        'cod_categoria': distribuicao(distribuicoes, 'livro.cod_categoria').sortear(rng, ids_categoria, n),
+        'ano_publicacao': rng.integers(1990, 2025, n),
+        'preco': _precos(rng, n),
+    })
+
+
+def gerar_estoque(n, rng, ids_livro):
+    # Cada livro aparece no máximo uma vez (cod_livro é a PK do estoque)
+    livros = ids_livro.sortear_distintos(rng, min(n, len(ids_livro)))
+    return pd.DataFrame({
+        'cod_livro': livros,
+        'quantidade': rng.integers(0, 151, len(livros)),
+    })
+
+
+def gerar_pedido(n, rng, ids_cliente, hoje=None, inicio=1, distribuicoes=None):
+    hoje = np.datetime64(hoje or date.today(), 'D')
+    data_inicial = hoje - np.timedelta64(4 * 365, 'D')
+    sazonalidade = (distribuicoes or {}).get('pedido.data_pedido')
+    if sazonalidade is None:
+        datas = _datas_entre(rng, data_inicial, hoje, n)
+    else:
+        datas = sazonalidade.sortear(rng, data_inicial, hoje, n)
+    return pd.DataFrame({
+        'cod_pedido': _ids(n, inicio),
+        'cod_cliente': distribuicao(distribuicoes, 'pedido.cod_cliente').sortear(rng, ids_cliente, n),
+        'data_pedido': np.datetime_as_string(datas, unit='D'),
+        'status': rng.choice(STATUS_PEDIDO, n),
+    })
+
+
+def gerar_tipo_pagamento():
+    return pd.DataFrame({
+        'cod_tipo': _ids(len(TIPOS_PAGAMENTO)),
+        'nome': TIPOS_PAGAMENTO,
+    })
+
+
+def gerar_item_pedido(n, rng, ids_pedido, ids_livro, inicio=1, distribuicoes=None):
+    return pd.DataFrame({
+        'cod_item': _ids(n, inicio),
+        'cod_pedido': distribuicao(distribuicoes, 'item_pedido.cod_pedido').sortear(rng, ids_pedido, n),
+        'cod_livro': distribuicao(distribuicoes, 'item_pedido.cod_livro').sortear(rng, ids_livro, n),
+        'quantidade': rng.integers(1, 6, n),
+        'preco_unitario': _precos(rng, n),
+    })
+
+
+def totais_por_pedido(item_pedido, n_pedidos):
+    """
+    Soma (preco_unitario * quantidade) de todos os pedidos em uma única passada.
+    Retorna um vetor indexado por cod_pedido (posição 0 não é usada).
+    """
+    valores = item_pedido['preco_unitario'].to_numpy() * item_pedido['quantidade'].to_numpy()
+    return np.bincount(
+        item_pedido['cod_pedido'].to_numpy(), weights=valores, minlength=n_pedidos + 1
+    )
+
+
+def gerar_pagamento(pedido, totais, rng, hoje=None, inicio=1):
+    """
+    Gera um pagamento por pedido com itens, no valor da soma dos itens.
+    totais traz o valor de cada linha de pedido, na mesma ordem.
+    """
+    hoje = np.datetime64(hoje or date.today(), 'D')
+    valor_pago = np.round(totais, 2)
+
+    # Só gera pagamento se valor for maior que zero
+    com_valor = valor_pago > 0
+    cod_pedido = pedido['cod_pedido'].to_numpy()[com_valor]
+    datas_pedido = pedido['data_pedido'].to_numpy()[com_valor].astype('datetime64[D]')
+    n = len(cod_pedido)
+
+    # Data do pagamento entre a data do pedido e hoje
+    dias = (hoje - datas_pedido).astype(np.int64) + 1
+    datas_pag = datas_pedido + (rng.random(n) * dias).astype(np.int64)
+
+    return pd.DataFrame({
+        'cod_pagamento': _ids(n, inicio),
+        'cod_pedido': cod_pedido,
+        'cod_tipo': rng.integers(1, len(TIPOS_PAGAMENTO) + 1, n),
+        'data_pag': np.datetime_as_string(datas_pag, unit='D'),
+        'valor_pago': valor_pago[com_valor],
+    })
+
+
+# ---------------------------------------------------------------------------
+# Destinos: para onde os lotes gerados são gravados
+# ---------------------------------------------------------------------------
+
+class DestinoCSV:
+    """
+    Grava cada tabela em {diretorio}/{tabela}.csv, acrescentando lote a lote
+    """
+
+    def __init__(self, diretorio='.', cabecalho=True):
+        self.diretorio = diretorio
+        self.cabecalho = cabecalho
+        self._arquivos = {}
+        os.makedirs(diretorio, exist_ok=True)
+
+    def escrever(self, tabela, df):
+        arquivo = self._arquivos.get(tabela)
+        if arquivo is None:
+            caminho = os.path.join(self.diretorio, f'{tabela}.csv')
+            arquivo = self._arquivos[tabela] = open(caminho, 'w', encoding='utf-8', newline='')
+            if self.cabecalho:
+                arquivo.write(','.join(df.columns) + '\n')
+        df.to_csv(arquivo, index=False, header=False)
+
+    def fechar(self):
+        for arquivo in self._arquivos.values():
+            arquivo.close()
+        self._arquivos = {}
+
+
+class DestinoParquet:
+    """
+    Grava cada tabela em {diretorio}/{tabela}.parquet, um row group por lote
+    """
+
+    def __init__(self, diretorio='.', compressao='snappy'):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("O destino Parquet requer o pacote 'pyarrow'.") from e
+
+        self._pa = pa
+        self._pq = pq
+        self.diretorio = diretorio
+        self.compressao = compressao
+        self._escritores = {}
+        os.makedirs(diretorio, exist_ok=True)
+
+    def escrever(self, tabela, df):
+        lote = self._pa.Table.from_pandas(df, preserve_index=False)
+        escritor = self._escritores.get(tabela)
+        if escritor is None:
+            caminho = os.path.join(self.diretorio, f'{tabela}.parquet')
+            escritor = self._escritores[tabela] = self._pq.ParquetWriter(
+                caminho, lote.schema, compression=self.compressao
+            )
+        escritor.write_table(lote)
+
+    def fechar(self):
+        for escritor in self._escritores.values():
+            escritor.close()
+        self._escritores = {}
+
+
+class DestinoSQLite:
+    """
+    Grava as tabelas no banco SQLite (livraria.db), recriando o esquema
+    """
+
+    def __init__(self, caminho_db='livraria.db'):
+        self.conn = sqlite3.connect(caminho_db, timeout=30)
+        criar_tabelas(self.conn)
+
+    def escrever(self, tabela, df):
+        gravar_tabela(self.conn, tabela, df)
+
+    def fechar(self):
+        self.conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Geração em lotes de tamanho fixo (memória limitada)
+# ---------------------------------------------------------------------------
+
+def _lotes(inicio, n, tamanho_lote):
+    """
+    Quebra a faixa de ids [inicio, inicio + n) em lotes: (inicio, quantidade)
+    """
+    for i in range(0, n, tamanho_lote):
+        yield inicio + i, min(tamanho_lote, n - i)
+
+
+def _gerar_faixas(destino, faixas, volumes, pool, rng, hoje, tamanho_lote, distribuicoes=None):
+    """
+    Gera em lotes as faixas de ids (inicio, quantidade) de cada tabela, menos
+    pagamento. Retorna os totais por pedido e as datas dos pedidos da faixa.
+    """
+    # Chaves dos pais: ids contíguos em 1..N, sorteados sem materializar a lista de ids
+    ids = {
+        tabela: FaixaIds(1, volumes[tabela])
+        for tabela in ('cliente', 'autor', 'editora', 'categoria', 'livro', 'pedido')
+    }
+
+    for inicio, n in _lotes(*faixas['cliente'], tamanho_lote):
+        destino.escrever('cliente', gerar_cliente(n, rng, pool, inicio))
+
+    for inicio, n in _lotes(*faixas['endereco'], tamanho_lote):
+        destino.escrever('endereco', gerar_endereco(n, rng, pool, ids['cliente'], inicio, distribuicoes))
+
+    for inicio, n in _lotes(*faixas['autor'], tamanho_lote):
+        destino.escrever('autor', gerar_autor(n, rng, pool, inicio))
+
+    for inicio, n in _lotes(*faixas['editora'], tamanho_lote):
+        destino.escrever('editora', gerar_editora(n, rng, pool, inicio))
+
+    for inicio, n in _lotes(*faixas['categoria'], tamanho_lote):
+        destino.escrever('categoria', gerar_categoria(n, rng, pool, inicio))
+
+    for inicio, n in _lotes(*faixas['livro'], tamanho_lote):
+        livro = gerar_livro(n, rng, pool, ids['autor'], ids['editora'], ids['categoria'], inicio, distribuicoes)
+        destino.escrever('livro', livro)
+
+    # Estoque: cada lote de livros recebe uma cota, sorteada sem repetição dentro do lote
+    lotes_livro = list(_lotes(*faixas['livro'], tamanho_lote))
+    cotas = _faixas(faixas['estoque'][1], len(lotes_livro)) if lotes_livro else []
+    for (inicio, n), (_, cota) in zip(lotes_livro, cotas):
+        destino.escrever('estoque', gerar_estoque(cota, rng, FaixaIds(inicio, inicio + n - 1)))
+
+    inicio_pedido, n_pedido = faixas['pedido']
+    datas_pedido = np.empty(n_pedido, dtype='datetime64[D]')
+    for inicio, n in _lotes(inicio_pedido, n_pedido, tamanho_lote):
+        pedido = gerar_pedido(n, rng, ids['cliente'], hoje, inicio, distribuicoes)
+        destino.escrever('pedido', pedido)
+        posicao = inicio - inicio_pedido
+        datas_pedido[posicao:posicao + n] = pedido['data_pedido'].to_numpy().astype('datetime64[D]')
+
+    totais = np.zeros(volumes['pedido'] + 1)
+    for inicio, n in _lotes(*faixas['item_pedido'], tamanho_lote):
+        item_pedido = gerar_item_pedido(n, rng, ids['pedido'], ids['livro'], inicio, distribuicoes)
+        destino.escrever('item_pedido', item_pedido)
+        totais += totais_por_pedido(item_pedido, volumes['pedido'])
+
+    return totais, datas_pedido
+
+
+def _gerar_pagamentos(destino, inicio_pedido, datas_pedido, valores, inicio_pagamento, rng, hoje, tamanho_lote):
+    """
+    Gera em lotes os pagamentos de uma faixa de pedidos já totalizada
+    """
+    for inicio, n in _lotes(inicio_pedido, len(datas_pedido), tamanho_lote):
+        posicao = inicio - inicio_pedido
+        pedido = pd.DataFrame({
+            'cod_pedido': _ids(n, inicio),
+            'data_pedido': datas_pedido[posicao:posicao + n],
+        })
+        pagamento = gerar_pagamento(pedido, valores[posicao:posicao + n], rng, hoje, inicio_pagamento)
+        destino.escrever('pagamento', pagamento)
+        inicio_pagamento += len(pagamento)
+
+
+def gerar_dataset(destino, scale_factor=1, volumes=None, seed=42, tamanho_lote=TAMANHO_LOTE, hoje=None,
+                  distribuicoes=None):
+    """
+    Gera todas as tabelas em lotes de tamanho fixo e grava no destino
+    (DestinoCSV, DestinoParquet ou DestinoSQLite). Só os lotes em andamento,
+    os totais e as datas por pedido ficam em memória.
+    distribuicoes: {'tabela.coluna': distribuição} (ver distribuicoes.py).
+    """
+    volumes = {**volumes_por_escala(scale_factor), **(volumes or {})}
+    rng = np.random.default_rng(seed)
+    pool = carregar_pool(seed)
+    hoje = np.datetime64(hoje or date.today(), 'D')
+
+    faixas = {tabela: (1, n) for tabela, n in volumes.items()}
+    faixas['estoque'] = (1, min(volumes['estoque'], volumes['livro']))
+    try:
+        totais, datas_pedido = _gerar_faixas(destino, faixas, volumes, pool, rng, hoje, tamanho_lote, distribuicoes)
+        destino.escrever('tipo_pagamento', gerar_tipo_pagamento())
+        _gerar_pagamentos(destino, 1, datas_pedido, totais[1:], 1, rng, hoje, tamanho_lote)
+    finally:
+        destino.fechar()
+
+
+def gerar_banco(caminho_db='livraria.db', volumes=None, seed=42, scale_factor=1, distribuicoes=None):
+    """
+    Gera todas as tabelas e grava no banco SQLite informado
+    """
+    gerar_dataset(DestinoSQLite(caminho_db), scale_factor, volumes, seed, distribuicoes=distribuicoes)
+
+
+# ---------------------------------------------------------------------------
+# Geração em shards (multi-processo) direto para CSV
+# ---------------------------------------------------------------------------
+
+def _faixas(n, n_shards):
+    """
+    Divide os ids 1..n em n_shards faixas contíguas: lista de (inicio, quantidade)
+    """
+    limites = np.linspace(0, n, n_shards + 1).astype(np.int64)
+    return [(int(a) + 1, int(b - a)) for a, b in zip(limites[:-1], limites[1:])]
+
+
+def _destino_do_shard(diretorio_partes, shard):
+    return DestinoCSV(os.path.join(diretorio_partes, f'{shard:05d}'), cabecalho=False)
+
+
+def _gerar_shard(shard, n_shards, volumes, seed, semente, diretorio_partes, hoje, tamanho_lote, distribuicoes):
+    """
+    Gera a faixa de ids do shard em todas as tabelas (menos pagamento).
+    Retorna os totais parciais por pedido e as datas dos pedidos do shard.
+    """
+    rng = np.random.default_rng(semente)
+    # O pool é o mesmo para todos os shards (lido do cache); o sorteio usa a semente do shard
+    pool = carregar_pool(seed)
+
+    faixas = {tabela: _faixas(n, n_shards)[shard] for tabela, n in volumes.items()}
+    # Estoque: a cota do shard é sorteada só entre os livros da sua faixa, sem repetição entre shards
+    faixas['estoque'] = _faixas(min(volumes['estoque'], volumes['livro']), n_shards)[shard]
+
+    destino = _destino_do_shard(diretorio_partes, shard)
+    try:
+        return _gerar_faixas(destino, faixas, volumes, pool, rng, hoje, tamanho_lote, distribuicoes)
+    finally:
+        destino.fechar()
+
+
+def _gerar_shard_pagamento(shard, inicio_pedido, datas_pedido, valores, inicio_pagamento, semente,
+                           diretorio_partes, hoje, tamanho_lote):
+    rng = np.random.default_rng(semente)
+    destino = _destino_do_shard(diretorio_partes, shard)
+    try:
+        _gerar_pagamentos(destino, inicio_pedido, datas_pedido, valores, inicio_pagamento, rng, hoje, tamanho_lote)
+    finally:
+        destino.fechar()
+
+
+def _unir_partes(diretorio_partes, diretorio, tabela, colunas):
+    """
+    Une as partes de uma tabela, na ordem dos shards, em {tabela}.csv
+    """
+    with open(os.path.join(diretorio, f'{tabela}.csv'), 'w', encoding='utf-8', newline='') as destino:
+        destino.write(','.join(colunas) + '\n')
+        for shard in sorted(os.listdir(diretorio_partes)):
+            caminho = os.path.join(diretorio_partes, shard, f'{tabela}.csv')
+            if not os.path.exists(caminho):
+                continue
+            with open(caminho, encoding='utf-8', newline='') as origem:
+                shutil.copyfileobj(origem, destino)
+
+
+def gerar_csvs(diretorio='.', scale_factor=1, n_shards=None, n_processos=None, seed=42, hoje=None,
+               tamanho_lote=TAMANHO_LOTE, distribuicoes=None):
+    """
+    Gera o dataset em shards paralelos e grava um {tabela}.csv por tabela.
+    O resultado depende apenas de seed e n_shards, não do número de processos.
+    """
+    volumes = volumes_por_escala(scale_factor)
+    n_shards = n_shards or os.cpu_count() or 1
+    hoje = np.datetime64(hoje or date.today(), 'D')
+    sementes = np.random.SeedSequence(seed).spawn(2 * n_shards)
+
+    diretorio_partes = os.path.join(diretorio, '_partes')
+    shutil.rmtree(diretorio_partes, ignore_errors=True)
+    os.makedirs(diretorio_partes)
+
+    # Cria o cache do pool antes de abrir os processos
+    carregar_pool(seed)
+
+    with ProcessPoolExecutor(max_workers=n_processos) as executor:
+        # Fase 1: todas as tabelas menos pagamento, acumulando os totais por pedido
+        totais = np.zeros(volumes['pedido'] + 1)
+        datas_pedido = {}
+        futuros = {
+            executor.submit(
+                _gerar_shard, shard, n_shards, volumes, seed, sementes[shard], diretorio_partes, hoje,
+                tamanho_lote, distribuicoes,
+            ): shard
+            for shard in range(n_shards)
+        }
+        for futuro in as_completed(futuros):
+            totais_shard, datas = futuro.result()
+            totais += totais_shard
+            datas_pedido[futuros[futuro]] = datas
+
+        # Fase 2: pagamento por faixa de pedidos, com ids contíguos entre os shards
+        inicio_pagamento = 1
+        futuros = []
+        for shard, (inicio, n) in enumerate(_faixas(volumes['pedido'], n_shards)):
+            valores = totais[inicio:inicio + n]
+            futuros.append(executor.submit(
+                _gerar_shard_pagamento, shard, inicio, datas_pedido[shard], valores, inicio_pagamento,
+                sementes[n_shards + shard], diretorio_partes, hoje, tamanho_lote,
+            ))
+            inicio_pagamento += int((np.round(valores, 2) > 0).sum())
+        for futuro in futuros:
+            futuro.result()
+
+    tipo_pagamento = _destino_do_shard(diretorio_partes, 0)
+    tipo_pagamento.escrever('tipo_pagamento', gerar_tipo_pagamento())
+    tipo_pagamento.fechar()
+
+    for tabela in TABELAS:
+        _unir_partes(diretorio_partes, diretorio, tabela, COLUNAS[tabela])
+    shutil.rmtree(diretorio_partes)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera o dataset sintético da livraria')
+    parser.add_argument('--formato', choices=['csv', 'parquet', 'sqlite'], default='csv')
+    parser.add_argument('--saida', default='.', help='diretório (csv/parquet) ou arquivo .db (sqlite)')
+    parser.add_argument('--scale-factor', type=float, default=1)
+    parser.add_argument('--tamanho-lote', type=int, default=TAMANHO_LOTE)
+    parser.add_argument('--shards', type=int, default=None, help='gera em shards multi-processo (apenas csv)')
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cenario', choices=sorted(CENARIOS), default='uniforme',
+                        help='distribuições das chaves estrangeiras e datas (ver distribuicoes.py)')
+    args = parser.parse_args()
+    distribuicoes = CENARIOS[args.cenario]
+
+    if args.shards:
+        if args.formato != 'csv':
+            parser.error('--shards só é suportado com --formato csv')
+        gerar_csvs(args.saida, args.scale_factor, args.shards, args.processos, args.seed,
+                   tamanho_lote=args.tamanho_lote, distribuicoes=distribuicoes)
+    else:
+        destinos = {'csv': DestinoCSV, 'parquet': DestinoParquet, 'sqlite': DestinoSQLite}
+        gerar_dataset(destinos[args.formato](args.saida), args.scale_factor, seed=args.seed,
+                      tamanho_lote=args.tamanho_lote, distribuicoes=distribuicoes)
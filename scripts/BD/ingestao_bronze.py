@@ -0,0 +1,332 @@
+"""
+Ingestão da camada Bronze orientada por uma lista de tabelas.
+
+Para cada tabela: descobre os arquivos dela na landing ({tabela}.csv ou
+{tabela}.parquet e os arquivos dentro de {tabela}/, como as faixas e os
+deltas gerados pelo Script_db_to_azure.py), lê com o esquema do registro
+(esquemas.py), acrescenta as colunas de auditoria (data_hora_bronze e
+nome_arquivo, por linha) e grava em Delta. As tabelas são gravadas em
+paralelo por um pool de threads sobre a mesma SparkSession e, no final,
+são impressas as linhas, os bytes lidos e a duração de cada uma.
+
+A ingestão é incremental: cada arquivo ingerido fica registrado no controle
+({controle}/{tabela}, fora da Bronze, por padrão {bronze}_controle),
+identificado pelo nome na landing e pelo SHA-256 do manifesto da landing
+(_manifesto.json) ou, sem manifesto, pelo tamanho e data de modificação.
+Só os arquivos novos ou com conteúdo novo são lidos. As linhas de um arquivo
+reenviado com o mesmo nome (ex.: o snapshot cliente.csv) substituem as da
+versão anterior, e as de um arquivo que saiu da landing (substituído por uma
+extração completa) são removidas: no Delta com replaceWhere em nome_arquivo,
+no Parquet regravando a tabela. incremental=False regrava a tabela inteira.
+
+Roda no Databricks (caminhos /mnt/...) ou no Spark local contra um
+diretório do disco (sem o delta-spark instalado, grava em Parquet):
+
+    python scripts/BD/ingestao_bronze.py --landing ./landing/Csvs --bronze ./bronze
+"""
+
+import argparse
+import json
+import posixpath
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from esquemas import MODELOS, colunas, esquema_spark
+
+TABELAS_BRONZE = [
+    "autor", "cliente", "editora", "endereco", "estoque",
+    "item_pedido", "livro", "pagamento", "pedido",
+]
+WORKERS_BRONZE = 4
+EXTENSOES = ("csv", "parquet")
+MANIFESTO_LANDING = "_manifesto.json"
+ESQUEMA_CONTROLE = "nome_arquivo string, assinatura string, bytes long, data_hora_bronze timestamp"
+
+
+class MetricasTabela:
+    """
+    Linhas gravadas, arquivos e bytes lidos da landing e duração de uma tabela
+    """
+
+    def __init__(self, tabela):
+        self.tabela = tabela
+        self.arquivos = 0
+        self.ignorados = 0
+        self.substituidos = 0
+        self.bytes = 0
+        self.linhas = 0
+        self.segundos = 0.0
+        self.erro = None
+
+
+def _listar(spark, caminho):
+    """
+    [(caminho, tamanho, data de modificação, é diretório)] pelo FileSystem do
+    Hadoop: o mesmo código lista o disco local, o DBFS e os pontos de montagem do ADLS
+    """
+    jvm = spark._jvm
+    path = jvm.org.apache.hadoop.fs.Path(caminho)
+    fs = path.getFileSystem(spark._jsc.hadoopConfiguration())
+    if not fs.exists(path):
+        return []
+    return [(s.getPath().toString(), s.getLen(), s.getModificationTime(), s.isDirectory()) for s in fs.listStatus(path)]
+
+
+def descobrir_arquivos(spark, landing, tabela):
+    """
+    Arquivos da tabela na landing: {tabela}.{csv,parquet} e os arquivos em {tabela}/.
+    Retorna [(caminho, nome na landing, tamanho, data de modificação)], ignorando
+    arquivos ainda sendo gravados (.parcial)
+    """
+    arquivos = []
+    for caminho, tamanho, modificado, diretorio in _listar(spark, landing):
+        nome = caminho.rstrip("/").rsplit("/", 1)[-1]
+        if diretorio and nome == tabela:
+            arquivos += [
+                (c, f"{tabela}/{c.rsplit('/', 1)[-1]}", t, m)
+                for c, t, m, d in _listar(spark, caminho) if not d and c.rsplit(".", 1)[-1] in EXTENSOES
+            ]
+        elif not diretorio and nome in (f"{tabela}.{extensao}" for extensao in EXTENSOES):
+            arquivos.append((caminho, nome, tamanho, modificado))
+    return sorted(arquivos)
+
+
+def ler_manifesto_landing(spark, landing):
+    """
+    {arquivo: {sha256, tamanho, ...}} do manifesto gravado na landing (armazenamento.Manifesto), se houver
+    """
+    if not _listar(spark, f"{landing}/{MANIFESTO_LANDING}"):
+        return {}
+    conteudo = spark.sparkContext.wholeTextFiles(f"{landing}/{MANIFESTO_LANDING}").collect()
+    return json.loads(conteudo[0][1]) if conteudo else {}
+
+
+def assinatura(arquivo, manifesto):
+    """
+    Identidade do conteúdo de um arquivo da landing: o SHA-256 do manifesto ou,
+    sem ele, tamanho e data de modificação
+    """
+    _, nome, tamanho, modificado = arquivo
+    registro = manifesto.get(nome)
+    if registro is not None and registro["tamanho"] == tamanho:
+        return f"sha256:{registro['sha256']}"
+    return f"arquivo:{tamanho}:{modificado}"
+
+
+def arquivos_ingeridos(spark, controle, tabela, formato_saida="delta"):
+    """
+    {nome na landing: (assinatura, bytes, data_hora_bronze)} dos arquivos cujas linhas estão na tabela
+    """
+    caminho = f"{controle}/{tabela}"
+    if not _listar(spark, caminho):
+        return {}
+    return {
+        linha.nome_arquivo: (linha.assinatura, linha.bytes, linha.data_hora_bronze)
+        for linha in spark.read.format(formato_saida).load(caminho).collect()
+    }
+
+
+def registrar_ingeridos(spark, controle, tabela, registros, formato_saida="delta"):
+    """
+    Regrava o controle da tabela com {nome na landing: (assinatura, bytes, data_hora_bronze)}.
+    O controle é pequeno (uma linha por arquivo) e lido inteiro antes: regravar mantém
+    uma única assinatura, a atual, por arquivo.
+    """
+    linhas = [(nome, *registro) for nome, registro in sorted(registros.items())]
+    (spark.createDataFrame(linhas, ESQUEMA_CONTROLE)
+          .write.format(formato_saida).mode("overwrite").save(f"{controle}/{tabela}"))
+
+
+def _contar(spark, caminho, formato_saida):
+    # Contagem pelos metadados do que foi gravado (estatísticas do Delta ou rodapés do Parquet)
+    if not _listar(spark, caminho):
+        return 0
+    return spark.read.format(formato_saida).load(caminho).count()
+
+
+def ler_arquivos(spark, caminhos, tabela, modelo="landing"):
+    """
+    DataFrame tipado com as colunas do registro e o arquivo de origem de cada
+    linha (nome_arquivo): CSV lido direto com o esquema explícito, Parquet
+    convertido para os tipos do registro
+    """
+    from pyspark.sql.functions import col
+
+    arquivo = col("_metadata.file_name").alias("nome_arquivo")
+    partes = []
+    csvs = [c for c in caminhos if c.endswith(".csv")]
+    parquets = [c for c in caminhos if c.endswith(".parquet")]
+    if csvs:
+        df = spark.read.schema(esquema_spark(tabela, modelo)).option("header", "true").csv(csvs)
+        partes.append(df.select("*", arquivo))
+    if parquets:
+        df = spark.read.parquet(*parquets)
+        partes.append(df.select(*[col(nome).cast(tipo).alias(nome) for nome, tipo in colunas(tabela, modelo)], arquivo))
+    df = partes[0]
+    for parte in partes[1:]:
+        df = df.unionByName(parte)
+    return df
+
+
+def com_auditoria(df):
+    """
+    Colunas de auditoria da Bronze: data e hora da ingestão e arquivo de origem de cada linha
+    """
+    from pyspark.sql.functions import current_timestamp
+
+    dados = [c for c in df.columns if c != "nome_arquivo"]
+    return df.select(*dados, current_timestamp().alias("data_hora_bronze"), "nome_arquivo")
+
+
+def _filtro_arquivos(nomes):
+    """
+    Predicado das linhas vindas dos arquivos (nome_arquivo guarda só o nome, sem a pasta)
+    """
+    valores = ", ".join("'" + posixpath.basename(nome).replace("'", "''") + "'" for nome in sorted(nomes))
+    return f"nome_arquivo IN ({valores})"
+
+
+def ingerir_tabela(spark, landing, bronze, tabela, modelo="landing", formato_saida="delta",
+                   incremental=True, manifesto=None, controle=None):
+    m = MetricasTabela(tabela)
+    inicio = time.perf_counter()
+    controle = controle or f"{bronze.rstrip('/')}_controle"
+    try:
+        # Descrição dos jobs desta thread na Spark UI
+        spark.sparkContext.setJobDescription(f"bronze: {tabela}")
+        arquivos = descobrir_arquivos(spark, landing, tabela)
+        if not arquivos:
+            raise FileNotFoundError(f"Nenhum arquivo da tabela '{tabela}' em {landing}")
+
+        destino = f"{bronze}/{tabela}"
+        assinaturas = {a[1]: assinatura(a, manifesto or {}) for a in arquivos}
+        # Sem a tabela gravada o controle não vale (ex.: tabela apagada): tudo é lido de novo
+        incremental = incremental and bool(_listar(spark, destino))
+        ingeridos = arquivos_ingeridos(spark, controle, tabela, formato_saida) if incremental else {}
+        # Tabela gravada sem entrada no controle (ex.: a Bronze anterior, com todas as colunas
+        # string): é regravada por inteiro, já com o schema tipado
+        incremental = incremental and bool(ingeridos)
+        novos = [a for a in arquivos if ingeridos.get(a[1], (None,))[0] != assinaturas[a[1]]]
+        lidos = {a[1] for a in novos}
+        # Arquivos já ingeridos que voltaram com outro conteúdo ou saíram da landing: as linhas deles saem da Bronze
+        substituidos = {nome for nome in ingeridos if nome not in assinaturas or nome in lidos}
+        if incremental and substituidos and formato_saida != "delta":
+            # Sem replaceWhere no Parquet: a tabela é regravada com os arquivos atuais da landing
+            incremental, ingeridos, novos = False, {}, arquivos
+
+        m.arquivos = len(novos)
+        m.ignorados = len(arquivos) - len(novos)
+        m.substituidos = len(substituidos)
+        m.bytes = sum(a[2] for a in novos)
+        if not novos and not substituidos:
+            print(f"⏭️ Bronze '{tabela}': nenhum arquivo novo ({m.ignorados} já ingerido(s))")
+        else:
+            if novos:
+                df = com_auditoria(ler_arquivos(spark, [a[0] for a in novos], tabela, modelo))
+            else:
+                df = spark.createDataFrame([], spark.read.format(formato_saida).load(destino).schema)
+            escrita = df.write.format(formato_saida)
+            if not incremental:
+                # Regravação completa troca também o schema (ex.: colunas string -> tipadas)
+                escrita.mode("overwrite").option("overwriteSchema", "true").save(destino)
+            elif formato_saida == "delta":
+                # Troca atômica só das linhas dos arquivos lidos agora e dos substituídos: repetir
+                # a ingestão depois de uma falha regrava as mesmas linhas, sem duplicar
+                filtro = _filtro_arquivos(substituidos | lidos)
+                escrita.mode("overwrite").option("replaceWhere", filtro).save(destino)
+            else:
+                escrita.mode("append").save(destino)
+            if not incremental:
+                m.linhas = _contar(spark, destino, formato_saida)
+            elif novos:
+                m.linhas = (spark.read.format(formato_saida).load(destino)
+                            .where(_filtro_arquivos(lidos)).count())
+
+            # Registrado só depois da gravação: uma falha no meio faz o arquivo ser lido de novo
+            agora = datetime.now()
+            registros = {nome: registro for nome, registro in ingeridos.items() if nome in assinaturas}
+            registros.update({a[1]: (assinaturas[a[1]], a[2], agora) for a in novos})
+            registrar_ingeridos(spark, controle, tabela, registros, formato_saida)
+            print(f"✅ Bronze '{tabela}': {m.linhas} linhas de {m.arquivos} arquivo(s) novo(s)"
+                  + (f", linhas de {m.substituidos} arquivo(s) substituído(s)" if substituidos else ""))
+    except Exception as e:
+        m.erro = e
+        print(f"❌ Erro na ingestão da tabela '{tabela}':", e)
+    m.segundos = time.perf_counter() - inicio
+    return m
+
+
+def ingerir_bronze(spark, landing, bronze, tabelas=None, modelo="landing", workers=WORKERS_BRONZE,
+                   formato_saida="delta", incremental=True, controle=None):
+    """
+    Ingere as tabelas em paralelo (workers threads na mesma SparkSession) e
+    imprime as métricas por tabela. O controle da ingestão incremental fica em
+    controle (padrão: {bronze}_controle), fora da Bronze. Retorna [MetricasTabela].
+    """
+    tabelas = tabelas or TABELAS_BRONZE
+    controle = controle or f"{bronze.rstrip('/')}_controle"
+    print(f"🚀 Bronze {'incremental' if incremental else 'completa'}: {len(tabelas)} tabelas, "
+          f"{workers} em paralelo, {landing} -> {bronze} ({formato_saida}), controle em {controle}")
+    manifesto = ler_manifesto_landing(spark, landing)
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        metricas = list(pool.map(
+            lambda t: ingerir_tabela(spark, landing, bronze, t, modelo, formato_saida, incremental,
+                                     manifesto, controle),
+            tabelas,
+        ))
+    total = time.perf_counter() - inicio
+
+    print("\n📈 Métricas por tabela:")
+    print(f"   {'tabela':<15} {'arquivos':>9} {'já ingeridos':>13} {'substituídos':>13} {'linhas':>10} "
+          f"{'MB lidos':>9} {'duração (s)':>12}")
+    for m in metricas:
+        if m.erro is not None:
+            print(f"   ❌ {m.tabela:<12} erro: {m.erro}")
+            continue
+        print(f"   {m.tabela:<15} {m.arquivos:>9} {m.ignorados:>13} {m.substituidos:>13} {m.linhas:>10} "
+              f"{m.bytes / 1e6:>9.1f} {m.segundos:>12.2f}")
+    print(f"⏱️ Bronze concluída em {total:.2f}s")
+    return metricas
+
+
+def criar_sessao_local(app="bronze-local"):
+    """
+    SparkSession local; com o delta-spark instalado já vem configurada para Delta
+    """
+    from pyspark.sql import SparkSession
+
+    builder = SparkSession.builder.appName(app).master("local[*]")
+    try:
+        from delta import configure_spark_with_delta_pip
+    except ImportError:
+        return builder.getOrCreate(), "parquet"
+    builder = (builder
+               .config("spark.sql.extensions", "io.delta.sql.DeltaSparkSessionExtension")
+               .config("spark.sql.catalog.spark_catalog", "org.apache.spark.sql.delta.catalog.DeltaCatalog"))
+    return configure_spark_with_delta_pip(builder).getOrCreate(), "delta"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestão da landing na camada Bronze com Spark local")
+    parser.add_argument("--landing", required=True, help="diretório da landing (ex.: ./landing/Csvs)")
+    parser.add_argument("--bronze", required=True, help="diretório de saída da Bronze")
+    parser.add_argument("--controle", help="controle da ingestão incremental (padrão: {bronze}_controle)")
+    parser.add_argument("--tabelas", nargs="+", default=TABELAS_BRONZE)
+    parser.add_argument("--modelo", choices=MODELOS, default="landing", help="modelo do registro de esquemas")
+    parser.add_argument("--workers", type=int, default=WORKERS_BRONZE)
+    parser.add_argument("--completa", action="store_true",
+                        help="regrava as tabelas inteiras em vez de acrescentar só os arquivos novos")
+    parser.add_argument("--formato-saida", choices=["delta", "parquet"],
+                        help="padrão: delta se o delta-spark estiver instalado, senão parquet")
+    args = parser.parse_args()
+
+    spark, formato = criar_sessao_local()
+    ingerir_bronze(spark, args.landing, args.bronze, args.tabelas, args.modelo, args.workers,
+                   args.formato_saida or formato, incremental=not args.completa, controle=args.controle)
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Pool de valores pt_BR pré-gerados com Faker para o gerador de dados.
+
+O Faker é chamado só uma vez por seed para montar um vocabulário grande
+(nomes, sobrenomes, ruas, cidades, títulos, ...), que é salvo em disco
+(.npz) e reaproveitado nas próximas execuções. Os geradores sorteiam
+valores do pool por índice com NumPy, sem nenhuma chamada ao Faker por linha.
+
+Para colunas que precisam ser únicas (e-mails) existe o modo combinatório:
+primeiro nome x sobrenome x domínio, com sufixo numérico quando as
+combinações se esgotam.
+"""
+
+import os
+import unicodedata
+
+import numpy as np
+
+TAMANHO_POOL = 10000
+DIRETORIO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+
+# Campo do pool -> método do Faker usado para preenchê-lo
+CAMPOS = {
+    'primeiro_nome': 'first_name',
+    'sobrenome': 'last_name',
+    'dominio': 'safe_domain_name',
+    'telefone': 'phone_number',
+    'rua': 'street_name',
+    'numero': 'building_number',
+    'cidade': 'city',
+    'estado': 'estado_sigla',
+    'cep': 'postcode',
+    'pais': 'country',
+    'empresa': 'company',
+    'palavra': 'word',
+    'titulo': 'catch_phrase',
+}
+
+# Campos usados no modo combinatório: só valores distintos interessam
+CAMPOS_DISTINTOS = ['primeiro_nome', 'sobrenome', 'dominio']
+
+
+def _sem_acento(texto):
+    texto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower().replace(' ', '')
+
+
+def criar_pool(seed=42, tamanho=TAMANHO_POOL):
+    """
+    Gera o pool chamando o Faker tamanho vezes para cada campo
+    """
+    # Import tardio: quem só usa o esquema do gerador (ex.: esquemas.py) não precisa do Faker
+    from faker import Faker
+
+    faker = Faker('pt_BR')
+    faker.seed_instance(seed)
+
+    pool = {}
+    for campo, metodo in CAMPOS.items():
+        gerar = getattr(faker, metodo)
+        valores = np.array([str(gerar()) for _ in range(tamanho)])
+        pool[campo] = np.unique(valores) if campo in CAMPOS_DISTINTOS else valores
+
+    # Versões sem acento e minúsculas para compor e-mails (distintas após normalizar)
+    pool['usuario_nome'] = np.unique([_sem_acento(v) for v in pool['primeiro_nome']])
+    pool['usuario_sobrenome'] = np.unique([_sem_acento(v) for v in pool['sobrenome']])
+    return pool
+
+
+def carregar_pool(seed=42, tamanho=TAMANHO_POOL, diretorio=DIRETORIO_CACHE):
+    """
+    Lê o pool do cache em disco, criando e salvando se ainda não existir
+    """
+    caminho = os.path.join(diretorio, f'pool_pt_BR_{seed}_{tamanho}.npz')
+    if os.path.exists(caminho):
+        with np.load(caminho) as dados:
+            return {campo: dados[campo] for campo in dados.files}
+
+    pool = criar_pool(seed, tamanho)
+    os.makedirs(diretorio, exist_ok=True)
+    # Grava em arquivo temporário e renomeia para não expor um cache pela metade
+    temporario = caminho + f'.{os.getpid()}.tmp.npz'
+    np.savez_compressed(temporario, **pool)
+    os.replace(temporario, caminho)
+    return pool
+
+
+def sortear(pool, campo, rng, n):
+    """
+    Sorteia n valores do campo por índice (com reposição)
+    """
+    valores = pool[campo]
+    return valores[rng.integers(0, len(valores), n)]
+
+
+def nomes(pool, rng, n):
+    """
+    Nomes completos: primeiro nome + sobrenome sorteados independentemente
+    """
+    return np.char.add(
+        np.char.add(sortear(pool, 'primeiro_nome', rng, n), ' '),
+        sortear(pool, 'sobrenome', rng, n),
+    )
+
+
+def emails_unicos(pool, ids):
+    """
+    E-mails únicos por id no modo combinatório (primeiro nome x sobrenome x domínio).
+    Quando o id passa do número de combinações, um sufixo numérico garante a unicidade.
+    """
+    ids = np.asarray(ids, dtype=np.int64) - 1
+    n_nome = len(pool['usuario_nome'])
+    n_sobrenome = len(pool['usuario_sobrenome'])
+    n_dominio = len(pool['dominio'])
+
+    i_nome = ids % n_nome
+    resto = ids // n_nome
+    i_sobrenome = resto % n_sobrenome
+    resto //= n_sobrenome
+    i_dominio = resto % n_dominio
+    rodada = resto // n_dominio
+
+    sufixo = np.where(rodada > 0, rodada.astype(str), '')
+    usuario = np.char.add(
+        np.char.add(np.char.add(pool['usuario_nome'][i_nome], '.'), pool['usuario_sobrenome'][i_sobrenome]),
+        sufixo,
+    )
+    return np.char.add(np.char.add(usuario, '@'), pool['dominio'][i_dominio])
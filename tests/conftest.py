@@ -0,0 +1,9 @@
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Os scripts importam os módulos vizinhos pelo nome (como quando rodam da própria pasta)
+for pasta in (os.path.join(RAIZ, 'scripts', 'BD'), os.path.join(RAIZ, 'banco_eng_dados')):
+    if pasta not in sys.path:
+        sys.path.insert(0, pasta)
@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+from armazenamento import ArmazenamentoLocal, Manifesto, UploaderEmBlocos, enviar_se_alterado
+
+BLOCO = 64 * 1024
+
+
+class _FalhaNoEnvio(Exception):
+    pass
+
+
+class _ArmazenamentoComFalha:
+    """
+    Repassa tudo para o armazenamento local, mas os file clients falham
+    depois de max_appends chamadas de append_data
+    """
+
+    def __init__(self, armazenamento, max_appends):
+        self._armazenamento = armazenamento
+        self.max_appends = max_appends
+        self.appends = 0
+
+    def __getattr__(self, nome):
+        return getattr(self._armazenamento, nome)
+
+    def get_file_client(self, nome_arquivo):
+        file_client = self._armazenamento.get_file_client(nome_arquivo)
+        original = file_client.append_data
+
+        def append_data(data, offset, length=None):
+            self.appends += 1
+            if self.appends > self.max_appends:
+                raise _FalhaNoEnvio(f"append {self.appends}")
+            original(data, offset, length)
+
+        file_client.append_data = append_data
+        return file_client
+
+
+@pytest.fixture
+def origem(tmp_path):
+    caminho = tmp_path / 'grande.csv'
+    caminho.write_bytes(os.urandom(20 * BLOCO + 123))
+    return caminho
+
+
+def _uploader(armazenamento, tmp_path):
+    return UploaderEmBlocos(armazenamento, tamanho_bloco=BLOCO, blocos_paralelos=3,
+                            bytes_por_confirmacao=4 * BLOCO, caminho_estado=str(tmp_path / 'uploads.json'))
+
+
+def test_upload_interrompido_retoma_e_fica_identico(tmp_path, origem):
+    landing = ArmazenamentoLocal(str(tmp_path / 'landing'))
+    landing.criar()
+    final = tmp_path / 'landing' / 'tabela' / 'grande.csv'
+
+    with pytest.raises(_FalhaNoEnvio):
+        _uploader(_ArmazenamentoComFalha(landing, max_appends=10), tmp_path).enviar(str(origem), 'tabela/grande.csv')
+    # Nada truncado com o nome final: a Bronze não enxerga o upload pela metade
+    assert not final.exists()
+
+    enviados = _uploader(landing, tmp_path).enviar(str(origem), 'tabela/grande.csv')
+
+    assert 0 < enviados < origem.stat().st_size
+    assert final.read_bytes() == origem.read_bytes()
+    assert landing.listar() == ['tabela/grande.csv']
+    assert json.loads((tmp_path / 'uploads.json').read_text()) == {}
+
+
+def test_arquivo_local_alterado_recomeca_do_zero(tmp_path, origem):
+    landing = ArmazenamentoLocal(str(tmp_path / 'landing'))
+    landing.criar()
+
+    with pytest.raises(_FalhaNoEnvio):
+        _uploader(_ArmazenamentoComFalha(landing, max_appends=10), tmp_path).enviar(str(origem), 'grande.csv')
+    origem.write_bytes(os.urandom(7 * BLOCO))
+
+    assert _uploader(landing, tmp_path).enviar(str(origem), 'grande.csv') == 7 * BLOCO
+    assert (tmp_path / 'landing' / 'grande.csv').read_bytes() == origem.read_bytes()
+
+
+def test_enviar_se_alterado_pula_conteudo_repetido(tmp_path, origem):
+    landing = ArmazenamentoLocal(str(tmp_path / 'landing'))
+    landing.criar()
+    manifesto = Manifesto(landing)
+    uploader = _uploader(landing, tmp_path)
+
+    assert enviar_se_alterado(landing, manifesto, str(origem), uploader=uploader)
+    assert not enviar_se_alterado(landing, manifesto, str(origem), uploader=uploader)
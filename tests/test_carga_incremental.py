@@ -0,0 +1,78 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import Script
+
+
+@pytest.fixture
+def carga(tmp_path):
+    """
+    Carga completa de autor (200 linhas) em um SQLite temporário; devolve
+    (backend, diretório dos CSVs, diretório do estado, DataFrame carregado)
+    """
+    diretorio = tmp_path / 'csv'
+    diretorio.mkdir()
+    autor = pd.read_csv(os.path.join(Script.DIRETORIO_CSV, 'autor.csv'), nrows=200)
+    autor.to_csv(diretorio / 'autor.csv', index=False)
+
+    backend = Script.BackendSQLite(str(tmp_path / 'carga.db'))
+    estado = str(tmp_path / 'estado')
+    conn = backend.conectar()
+    Script.criar_tabelas(backend, conn, diretorio_estado=estado)
+    conn.close()
+    Script.carregar_dados(backend, 50, str(diretorio), n_workers=2, diretorio_estado=estado)
+    return backend, diretorio, estado, autor
+
+
+def _autores(backend):
+    conn = sqlite3.connect(backend.caminho_db)
+    try:
+        return pd.read_sql("SELECT * FROM autor ORDER BY id_autor", conn)
+    finally:
+        conn.close()
+
+
+def test_insert_update_delete(carga):
+    backend, diretorio, estado, autor = carga
+    novo = autor[~autor['id_autor'].isin([7, 150])].copy()
+    novo.loc[novo['id_autor'] == 42, 'nome'] = 'Nome Alterado'
+    extras = pd.DataFrame({'id_autor': [201, 202, 203], 'nome': ['A', 'B', 'C'],
+                           'nacionalidade': ['Brasil'] * 3})
+    novo = pd.concat([novo, extras], ignore_index=True)
+    novo.to_csv(diretorio / 'autor.csv', index=False)
+
+    metricas = Script.atualizar_dados(backend, 50, str(diretorio), n_workers=2, diretorio_estado=estado)
+
+    assert metricas['autor'][:3] == (3, 1, 2)
+    banco = _autores(backend)
+    esperado = novo.sort_values('id_autor', ignore_index=True)
+    pd.testing.assert_frame_equal(banco, esperado, check_dtype=False)
+
+    # Sem mudanças no CSV, a próxima execução não tem nada a aplicar
+    assert Script.atualizar_dados(backend, 50, str(diretorio), n_workers=2,
+                                  diretorio_estado=estado)['autor'][:3] == (0, 0, 0)
+
+
+def test_estado_descartado_quando_a_tabela_foi_recriada(carga):
+    backend, diretorio, estado, autor = carga
+    conn = backend.conectar()
+    conn.execute("DELETE FROM autor")
+    conn.commit()
+    conn.close()
+
+    metricas = Script.atualizar_dados(backend, 50, str(diretorio), n_workers=2, diretorio_estado=estado)
+
+    assert metricas['autor'][0] == len(autor)
+    assert len(_autores(backend)) == len(autor)
+
+
+def test_recriar_tabelas_remove_o_estado(carga):
+    backend, _, estado, _ = carga
+    assert os.path.exists(os.path.join(estado, 'autor.npz'))
+    conn = backend.conectar()
+    Script.criar_tabelas(backend, conn, diretorio_estado=estado)
+    conn.close()
+    assert not os.listdir(estado)
@@ -0,0 +1,145 @@
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+import Script_db_to_azure as extracao
+
+
+def _arquivos(diretorio):
+    """
+    {caminho relativo: bytes} dos arquivos de dados (sem o manifesto)
+    """
+    resultado = {}
+    for raiz, _, nomes in os.walk(diretorio):
+        for nome in nomes:
+            caminho = os.path.join(raiz, nome)
+            relativo = os.path.relpath(caminho, diretorio)
+            if relativo != '_manifesto.json':
+                with open(caminho, 'rb') as f:
+                    resultado[relativo] = f.read()
+    return resultado
+
+
+@pytest.fixture
+def banco(tmp_path):
+    caminho = str(tmp_path / 'origem.db')
+    conn = sqlite3.connect(caminho)
+    conn.execute("CREATE TABLE cliente (id_cliente INT PRIMARY KEY, nome VARCHAR(100), email VARCHAR(100))")
+    conn.execute("CREATE TABLE pedido (id_pedido INT PRIMARY KEY, id_cliente INT, data DATE, "
+                 "valor_total DECIMAL(10,2))")
+    conn.executemany("INSERT INTO cliente VALUES (?, ?, ?)",
+                     [(i, f'Cliente {i}', f'cliente{i}@exemplo.com') for i in range(1, 1201)])
+    conn.executemany("INSERT INTO pedido VALUES (?, ?, ?, ?)",
+                     [(i, i % 1200 + 1, f'2025-01-{i % 28 + 1:02d}', round(i * 1.37, 2)) for i in range(1, 3001)])
+    conn.commit()
+    conn.close()
+    return caminho
+
+
+def _extrair(monkeypatch, banco, destino, modo, formato, max_fila=extracao.MAX_FILA):
+    monkeypatch.setenv('SQL_CHUNK_SIZE', '250')
+    monkeypatch.setenv('EXTRACAO_MAX_FILA', str(max_fila))
+    monkeypatch.setenv('EXTRACAO_MIN_PARTICAO', '1000')
+    monkeypatch.setenv('EXTRACAO_ESTADO', str(destino) + '_watermarks.json')
+    extracao.elt_sql_sqlserver_to_adls(modo, banco, str(destino), formato, incremental=False)
+    return _arquivos(destino)
+
+
+@pytest.mark.parametrize('formato', extracao.FORMATOS)
+@pytest.mark.parametrize('max_fila', [1, extracao.MAX_FILA])
+def test_pipeline_igual_ao_serial(monkeypatch, tmp_path, banco, formato, max_fila):
+    if formato == 'parquet':
+        pytest.importorskip('pyarrow')
+    serial = _extrair(monkeypatch, banco, tmp_path / 'serial', 'serial', formato)
+    pipeline = _extrair(monkeypatch, banco, tmp_path / 'pipeline', 'pipeline', formato, max_fila)
+
+    assert serial
+    # pedido tem 3000 chaves: é lido em faixas, um arquivo por partição
+    assert any(os.path.dirname(nome) == 'pedido' for nome in serial)
+    assert sorted(pipeline) == sorted(serial)
+    for nome, conteudo in serial.items():
+        assert pipeline[nome] == conteudo, nome
+
+
+def test_incremental_so_linhas_novas(monkeypatch, tmp_path, banco):
+    destino = tmp_path / 'landing'
+    monkeypatch.setenv('EXTRACAO_ESTADO', str(tmp_path / 'watermarks.json'))
+    monkeypatch.setenv('EXTRACAO_PARTICOES', '1')
+    extracao.elt_sql_sqlserver_to_adls('serial', banco, str(destino), 'csv', incremental=True)
+    assert len(os.listdir(destino / 'pedido')) == 1
+
+    # Sem linhas novas: nenhum arquivo de delta (nem vazio) na landing
+    extracao.elt_sql_sqlserver_to_adls('pipeline', banco, str(destino), 'csv', incremental=True)
+    assert len(os.listdir(destino / 'pedido')) == 1
+
+    conn = sqlite3.connect(banco)
+    conn.execute("INSERT INTO pedido VALUES (3001, 1, '2025-01-28', 9.99)")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(extracao, 'datetime', _Relogio)
+    extracao.elt_sql_sqlserver_to_adls('serial', banco, str(destino), 'csv', incremental=True)
+
+    delta = (destino / 'pedido' / 'pedido_20990101T000000Z.csv').read_text()
+    assert delta.splitlines() == ['id_pedido,id_cliente,data,valor_total', '3001,1,2025-01-28,9.99']
+
+
+class _Relogio(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return datetime(2099, 1, 1, tzinfo=tz)
+
+
+def test_extracao_completa_remove_arquivos_substituidos(monkeypatch, tmp_path, banco):
+    destino = tmp_path / 'landing'
+    monkeypatch.setenv('EXTRACAO_ESTADO', str(tmp_path / 'watermarks.json'))
+    monkeypatch.setenv('EXTRACAO_MIN_PARTICAO', '1000')
+    monkeypatch.setenv('EXTRACAO_PARTICOES', '4')
+    extracao.elt_sql_sqlserver_to_adls('pipeline', banco, str(destino), 'csv', incremental=False)
+    assert len(os.listdir(destino / 'pedido')) == 4
+
+    # Menos faixas: as partes antigas saem da landing e do manifesto
+    monkeypatch.setenv('EXTRACAO_PARTICOES', '2')
+    extracao.elt_sql_sqlserver_to_adls('serial', banco, str(destino), 'csv', incremental=False)
+    assert sorted(os.listdir(destino / 'pedido')) == ['pedido_part000.csv', 'pedido_part001.csv']
+
+    # Sem particionar: pedido.csv substitui as partes
+    monkeypatch.setenv('EXTRACAO_PARTICOES', '1')
+    extracao.elt_sql_sqlserver_to_adls('pipeline', banco, str(destino), 'csv', incremental=False)
+    assert os.listdir(destino / 'pedido') == []
+    assert sorted(_arquivos(destino)) == ['cliente.csv', 'pedido.csv']
+    manifesto = json.loads((destino / '_manifesto.json').read_text())
+    assert sorted(manifesto) == ['cliente.csv', 'pedido.csv']
+
+    # Primeira execução incremental (extração completa em pedido/): pedido.csv sai
+    extracao.elt_sql_sqlserver_to_adls('serial', banco, str(destino), 'csv', incremental=True)
+    assert len(os.listdir(destino / 'pedido')) == 1
+    assert sorted(_arquivos(destino))[0] == 'cliente.csv' and 'pedido.csv' not in _arquivos(destino)
+
+
+@pytest.mark.parametrize('modo', ['serial', 'pipeline'])
+def test_falha_na_extracao_mantem_o_arquivo_anterior(monkeypatch, tmp_path, banco, modo):
+    destino = tmp_path / 'landing'
+    monkeypatch.setenv('EXTRACAO_ESTADO', str(tmp_path / 'watermarks.json'))
+    monkeypatch.setenv('EXTRACAO_PARTICOES', '1')
+    monkeypatch.setenv('SQL_CHUNK_SIZE', '250')
+    extracao.elt_sql_sqlserver_to_adls(modo, banco, str(destino), 'csv', incremental=False)
+    anterior = _arquivos(destino)
+
+    # A leitura de pedido cai depois do primeiro chunk já enviado
+    extrair = extracao.FonteSQLite.extrair
+
+    def extrair_com_falha(self, full_table_name, *args, **kwargs):
+        for i, df in enumerate(extrair(self, full_table_name, *args, **kwargs)):
+            if full_table_name == 'pedido' and i == 1:
+                raise sqlite3.OperationalError('conexão perdida')
+            yield df
+
+    monkeypatch.setattr(extracao.FonteSQLite, 'extrair', extrair_com_falha)
+    extracao.elt_sql_sqlserver_to_adls(modo, banco, str(destino), 'csv', incremental=False)
+
+    atual = _arquivos(destino)
+    for nome, conteudo in anterior.items():
+        assert atual[nome] == conteudo, nome
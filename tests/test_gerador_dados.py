@@ -0,0 +1,30 @@
+import os
+
+from gerador_dados import TABELAS, gerar_csvs
+
+
+def _ler(diretorio, tabela):
+    with open(os.path.join(diretorio, f'{tabela}.csv'), 'rb') as f:
+        return f.read()
+
+
+def test_shards_independem_do_numero_de_processos(tmp_path):
+    # O resultado depende só de seed e n_shards: 1 processo ou 3 geram os mesmos bytes
+    um, tres = tmp_path / 'um', tmp_path / 'tres'
+    um.mkdir()
+    tres.mkdir()
+    gerar_csvs(str(um), scale_factor=0.01, n_shards=3, n_processos=1, hoje='2025-06-30')
+    gerar_csvs(str(tres), scale_factor=0.01, n_shards=3, n_processos=3, hoje='2025-06-30')
+
+    for tabela in TABELAS:
+        assert _ler(um, tabela) == _ler(tres, tabela), tabela
+    assert not os.path.exists(os.path.join(um, '_partes'))
+
+
+def test_ids_contiguos_entre_shards(tmp_path):
+    gerar_csvs(str(tmp_path), scale_factor=0.01, n_shards=4, n_processos=2, hoje='2025-06-30')
+
+    for tabela in ('cliente', 'pedido', 'pagamento'):
+        linhas = _ler(tmp_path, tabela).decode('utf-8').splitlines()[1:]
+        ids = [int(linha.split(',', 1)[0]) for linha in linhas]
+        assert ids == list(range(1, len(ids) + 1)), tabela
@@ -0,0 +1,136 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyspark')
+if not (shutil.which('java') or os.getenv('JAVA_HOME')):
+    pytest.skip('o Spark local precisa de um JVM', allow_module_level=True)
+
+import ingestao_bronze as bronze
+
+
+@pytest.fixture(scope='module')
+def sessao():
+    """
+    (SparkSession, formato de saída): delta se o delta-spark estiver instalado
+    """
+    spark, formato = bronze.criar_sessao_local('bronze-testes')
+    yield spark, formato
+    spark.stop()
+
+
+@pytest.fixture
+def spark(sessao):
+    return sessao[0]
+
+
+@pytest.fixture(params=['parquet', 'delta'])
+def formato(request, sessao):
+    if request.param == 'delta' and sessao[1] != 'delta':
+        pytest.skip('delta-spark não instalado')
+    return request.param
+
+
+@pytest.fixture
+def landing(tmp_path):
+    """
+    autor.csv na raiz; pedido em faixas (uma em CSV e outra em Parquet), mais
+    arquivos que a descoberta deve ignorar
+    """
+    raiz = tmp_path / 'landing'
+    (raiz / 'pedido').mkdir(parents=True)
+    pd.DataFrame({'cod_autor': [1, 2, 3], 'nome': ['Ana', 'Bruno', 'Carla'],
+                  'nacionalidade': ['Brasil', 'Chile', 'Peru']}).to_csv(raiz / 'autor.csv', index=False)
+    pd.DataFrame({'cod_pedido': [1, 2], 'cod_cliente': [10, 20], 'data_pedido': ['2025-01-01', '2025-01-02'],
+                  'status': ['Pago', 'Pendente']}).to_csv(raiz / 'pedido' / 'pedido_part000.csv', index=False)
+    pd.DataFrame({'cod_pedido': [3, 4], 'cod_cliente': [30, 40], 'data_pedido': ['2025-01-03', '2025-01-04'],
+                  'status': ['Pago', 'Cancelado']}).to_parquet(raiz / 'pedido' / 'pedido_part001.parquet', index=False)
+    (raiz / 'pedido' / 'pedido_part002.csv.enviando').write_text('cod_pedido\n99\n')
+    (raiz / 'pedido.csv.parcial').write_text('cod_pedido\n98\n')
+    return str(raiz)
+
+
+def test_descobrir_arquivos(spark, landing):
+    nomes = [nome for _, nome, _, _ in bronze.descobrir_arquivos(spark, landing, 'pedido')]
+    assert nomes == ['pedido/pedido_part000.csv', 'pedido/pedido_part001.parquet']
+
+
+def test_ingerir_bronze_csv_e_parquet(spark, landing, tmp_path):
+    destino = str(tmp_path / 'bronze')
+    metricas = bronze.ingerir_bronze(spark, landing, destino, ['autor', 'pedido'], workers=2,
+                                     formato_saida='parquet', incremental=False)
+
+    por_tabela = {m.tabela: m for m in metricas}
+    assert all(m.erro is None for m in metricas)
+    assert (por_tabela['autor'].linhas, por_tabela['autor'].arquivos) == (3, 1)
+    assert (por_tabela['pedido'].linhas, por_tabela['pedido'].arquivos) == (4, 2)
+
+    pedido = spark.read.parquet(f'{destino}/pedido')
+    tipos = dict(pedido.dtypes)
+    assert tipos['cod_pedido'] == 'bigint' and tipos['data_pedido'] == 'date'
+    assert pedido.columns[-2:] == ['data_hora_bronze', 'nome_arquivo']
+    origem = {(linha.cod_pedido, linha.nome_arquivo) for linha in pedido.collect()}
+    assert origem == {(1, 'pedido_part000.csv'), (2, 'pedido_part000.csv'),
+                      (3, 'pedido_part001.parquet'), (4, 'pedido_part001.parquet')}
+
+
+def _linhas(spark, caminho, formato):
+    return sorted((linha[0], linha.nome_arquivo) for linha in spark.read.format(formato).load(caminho).collect())
+
+
+def test_ingestao_incremental(spark, formato, landing, tmp_path):
+    destino = str(tmp_path / 'bronze')
+    raiz = tmp_path / 'landing'
+
+    def ingerir():
+        metricas = bronze.ingerir_bronze(spark, landing, destino, ['autor', 'pedido'], workers=2,
+                                         formato_saida=formato, incremental=True)
+        assert all(m.erro is None for m in metricas)
+        return {m.tabela: (m.arquivos, m.ignorados, m.substituidos, m.linhas) for m in metricas}
+
+    assert ingerir() == {'autor': (1, 0, 0, 3), 'pedido': (2, 0, 0, 4)}
+    # O controle fica fora da Bronze: a Silver lista a Bronze e lê cada pasta como tabela
+    assert sorted(os.listdir(destino)) == ['autor', 'pedido']
+    assert sorted(os.listdir(destino + '_controle')) == ['autor', 'pedido']
+
+    # Sem mudanças na landing: nada é lido
+    assert ingerir() == {'autor': (0, 1, 0, 0), 'pedido': (0, 2, 0, 0)}
+
+    # Snapshot reenviado com o mesmo nome (uma linha alterada, uma nova) e uma faixa nova de pedido
+    pd.DataFrame({'cod_autor': [1, 2, 3, 4], 'nome': ['Ana', 'Bruna', 'Carla', 'Davi'],
+                  'nacionalidade': ['Brasil', 'Chile', 'Peru', 'Cuba']}).to_csv(raiz / 'autor.csv', index=False)
+    pd.DataFrame({'cod_pedido': [5], 'cod_cliente': [50], 'data_pedido': ['2025-01-05'],
+                  'status': ['Pago']}).to_csv(raiz / 'pedido' / 'pedido_part002.csv', index=False)
+    assert ingerir() == {'autor': (1, 0, 1, 4), 'pedido': (1, 2, 0, 1)}
+    assert _linhas(spark, f'{destino}/autor', formato) == [(i, 'autor.csv') for i in range(1, 5)]
+    autor = spark.read.format(formato).load(f'{destino}/autor').where('cod_autor = 2').collect()
+    assert [linha.nome for linha in autor] == ['Bruna']
+    assert [linha[0] for linha in _linhas(spark, f'{destino}/pedido', formato)] == [1, 2, 3, 4, 5]
+
+    # Arquivo que saiu da landing (substituído por uma extração completa): as linhas dele saem da Bronze
+    os.remove(raiz / 'pedido' / 'pedido_part000.csv')
+    assert ingerir()['pedido'][2] == 1
+    assert [linha[0] for linha in _linhas(spark, f'{destino}/pedido', formato)] == [3, 4, 5]
+    assert ingerir() == {'autor': (0, 1, 0, 0), 'pedido': (0, 2, 0, 0)}
+
+
+def test_tabela_antiga_sem_controle_e_regravada_tipada(spark, formato, landing, tmp_path):
+    # Bronze anterior ao motor: todas as colunas string e nenhum registro no controle
+    destino = str(tmp_path / 'bronze')
+    antiga = spark.createDataFrame([('1', 'Antigo', 'Brasil', '2024-01-01', 'autor.csv')],
+                                   'cod_autor string, nome string, nacionalidade string, '
+                                   'data_hora_bronze string, nome_arquivo string')
+    antiga.write.format(formato).save(f'{destino}/autor')
+
+    metricas = bronze.ingerir_bronze(spark, landing, destino, ['autor'], workers=1,
+                                     formato_saida=formato, incremental=True)
+
+    assert metricas[0].erro is None
+    assert (metricas[0].arquivos, metricas[0].linhas) == (1, 3)
+    autor = spark.read.format(formato).load(f'{destino}/autor')
+    assert dict(autor.dtypes)['cod_autor'] == 'bigint'
+    assert sorted(linha.nome for linha in autor.collect()) == ['Ana', 'Bruno', 'Carla']
+    assert bronze.ingerir_bronze(spark, landing, destino, ['autor'], workers=1, formato_saida=formato,
+                                 incremental=True)[0].ignorados == 1